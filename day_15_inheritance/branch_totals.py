@@ -0,0 +1,165 @@
+# Branch level and bank level deposit totals
+# Totals are kept up to date on every credit/debit (O(1) delta update)
+# so dashboards can read them without summing every account again.
+
+import random
+import time
+
+
+class Account:
+    def __init__(self, number, holder, branch, balance=0):
+        self.number = number
+        self.holder = holder
+        self.branch = branch
+        self.balance = balance
+
+
+class Branch:
+    def __init__(self, name):
+        self.name = name
+        self.accounts = {}  # account number -> Account
+        self.total_deposits = 0
+
+
+class Bank:
+    def __init__(self, name):
+        self.name = name
+        self.branches = {}  # branch name -> Branch
+        self.accounts = {}  # account number -> Account
+        self.total_deposits = 0
+        self.next_account_number = 1
+
+    def display(self):
+        print(f"Welcome to {self.name} bank")
+
+    def addBranch(self, branch_name):
+        if branch_name not in self.branches:
+            self.branches[branch_name] = Branch(branch_name)
+        return self.branches[branch_name]
+
+    def openAccount(self, name, branch_name, opening_balance=0):
+        branch = self.addBranch(branch_name)
+        acc = Account(self.next_account_number, name, branch)
+        self.next_account_number += 1
+
+        branch.accounts[acc.number] = acc
+        self.accounts[acc.number] = acc
+        if opening_balance:
+            self.credit(acc.number, opening_balance)
+        return acc
+
+    def _apply(self, acc, delta):
+        # the only place where balances change -> aggregates can never drift
+        acc.balance += delta
+        acc.branch.total_deposits += delta
+        self.total_deposits += delta
+
+    def credit(self, account_number, amount):
+        if amount <= 0:
+            raise ValueError("Credit amount must be positive")
+        acc = self.accounts[account_number]
+        self._apply(acc, amount)
+        return acc.balance
+
+    def debit(self, account_number, amount):
+        if amount <= 0:
+            raise ValueError("Debit amount must be positive")
+        acc = self.accounts[account_number]
+        if amount > acc.balance:
+            raise ValueError(f"Insufficient balance in account {account_number}")
+        self._apply(acc, -amount)
+        return acc.balance
+
+    def branchTotal(self, branch_name):
+        return self.branches[branch_name].total_deposits
+
+    def bankTotal(self):
+        return self.total_deposits
+
+    # on-demand summation, used by the checker and the benchmark
+    def sumBranch(self, branch_name):
+        return sum(acc.balance for acc in self.branches[branch_name].accounts.values())
+
+    def sumBank(self):
+        return sum(acc.balance for acc in self.accounts.values())
+
+    def checkConsistency(self):
+        # returns a list of problems, empty list means aggregates are correct
+        problems = []
+        for branch in self.branches.values():
+            actual = self.sumBranch(branch.name)
+            if actual != branch.total_deposits:
+                problems.append(f"Branch {branch.name}: stored {branch.total_deposits}, actual {actual}")
+        actual = self.sumBank()
+        if actual != self.total_deposits:
+            problems.append(f"Bank {self.name}: stored {self.total_deposits}, actual {actual}")
+        return problems
+
+
+class SbiBank(Bank):
+    def __init__(self, name, branch):
+        self.branch = branch
+        super().__init__(name)
+        self.ifsc = "sbi776655"
+        self.addBranch(branch)
+
+    def display(self):
+        super().display()
+        print(f"Branch: {self.branch}")
+
+    def openAccount(self, name, branch_name=None, opening_balance=0):
+        # default to the home branch like the original demo
+        return super().openAccount(name, branch_name or self.branch, opening_balance)
+
+
+def benchmark(branch_count=20, accounts_per_branch=2000, operations=20000, reads=2000):
+    bank = SbiBank("SBI", "Ghaziabad")
+    branch_names = [f"Branch-{i}" for i in range(branch_count)]
+    for branch_name in branch_names:
+        for i in range(accounts_per_branch):
+            bank.openAccount(f"Customer-{i}", branch_name, 1000)
+
+    numbers = list(bank.accounts)
+    start = time.perf_counter()
+    for _ in range(operations):
+        number = random.choice(numbers)
+        if random.random() < 0.5 or bank.accounts[number].balance < 100:
+            bank.credit(number, 100)
+        else:
+            bank.debit(number, 100)
+    update_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(reads):
+        bank.branchTotal(branch_names[i % branch_count])
+        bank.bankTotal()
+    incremental_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(reads):
+        bank.sumBranch(branch_names[i % branch_count])
+        bank.sumBank()
+    summation_time = time.perf_counter() - start
+
+    print(f"Accounts: {len(numbers)}, updates: {operations}, dashboard reads: {reads}")
+    print(f"Updates with aggregates:     {update_time:.4f}s")
+    print(f"Reads (incremental totals):  {incremental_time:.4f}s")
+    print(f"Reads (on-demand summation): {summation_time:.4f}s")
+    print(f"Consistency problems: {bank.checkConsistency()}")
+
+
+if __name__ == "__main__":
+    sbi = SbiBank("SBI", "Ghaziabad")
+    sbi.display()
+
+    ramesh = sbi.openAccount("Ramesh", opening_balance=5000)
+    suresh = sbi.openAccount("Suresh", "Noida", 3000)
+    sbi.credit(ramesh.number, 1500)
+    sbi.debit(suresh.number, 1000)
+
+    print(f"Ghaziabad deposits: {sbi.branchTotal('Ghaziabad')}")
+    print(f"Noida deposits: {sbi.branchTotal('Noida')}")
+    print(f"SBI deposits: {sbi.bankTotal()}")
+    print(f"Consistency problems: {sbi.checkConsistency()}")
+
+    benchmark()
@@ -0,0 +1,174 @@
+# Asyncio version of the ticket booking
+#
+# book_train_ticket in demo2.py spends its time in time.sleep(1/2), which
+# stands in for I/O (payment, IRCTC call). A coroutine waiting on I/O costs
+# a few KB while an OS thread costs a whole stack, so tens of thousands of
+# passengers fit in one thread. A semaphore caps the bookings in flight and
+# every booking gets its own timeout.
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from booking_engine import BookingEngine, BookingResult, TicketInventory
+
+
+class AsyncBookingService:
+    def __init__(self, total_available_tickets, max_in_flight=1000, timeout=5.0, booking_time=1/2):
+        self.available = total_available_tickets
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.booking_time = booking_time
+        self.semaphore = None  # created inside the running loop
+
+    async def _confirm(self, passenger_name, train_number):
+        await asyncio.sleep(self.booking_time)
+
+    async def book_train_ticket(self, passenger_name, train_number):
+        async with self.semaphore:
+            # one event loop thread -> check + decrement can not be interrupted
+            if self.available <= 0:
+                return BookingResult(passenger_name, train_number, False,
+                                     f"All tickets are sold on train {train_number}")
+            self.available -= 1
+            try:
+                await asyncio.wait_for(self._confirm(passenger_name, train_number), self.timeout)
+            except asyncio.TimeoutError:
+                self.available += 1  # give the ticket back
+                return BookingResult(passenger_name, train_number, False,
+                                     f"Booking timed out for {passenger_name}")
+            return BookingResult(passenger_name, train_number, True,
+                                 f"Ticket is booked successfully for {passenger_name} on train {train_number}")
+
+    async def book_all(self, passengers, train_number):
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks = [self.book_train_ticket(p, train_number) for p in passengers]
+        return await asyncio.gather(*tasks)
+
+
+# ---------- comparison harness: threads vs asyncio vs processes ----------
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _run_threads(passengers, tickets, concurrency, booking_time, timeout):
+    latencies = []
+    start = time.perf_counter()
+
+    class TimedEngine(BookingEngine):
+        def book_train_ticket(self, passenger_name, train_number):
+            result = super().book_train_ticket(passenger_name, train_number)
+            if result.booked and booking_time > timeout:
+                # the worker only waited `timeout` seconds -> give the ticket back
+                self.inventory.release()
+                result = BookingResult(passenger_name, train_number, False,
+                                       f"Booking timed out for {passenger_name}")
+            latencies.append(time.perf_counter() - start)
+            return result
+
+    engine = TimedEngine(TicketInventory(tickets), workers=concurrency,
+                         queue_size=len(passengers), booking_time=min(booking_time, timeout))
+    results = engine.book_all(passengers, 12345)
+    elapsed = time.perf_counter() - start
+    engine.shutdown()
+    return results, latencies, elapsed, 0
+
+
+def _run_asyncio(passengers, tickets, concurrency, booking_time, timeout):
+    latencies = []
+    start = time.perf_counter()
+
+    class TimedService(AsyncBookingService):
+        async def book_train_ticket(self, passenger_name, train_number):
+            result = await super().book_train_ticket(passenger_name, train_number)
+            latencies.append(time.perf_counter() - start)
+            return result
+
+    service = TimedService(tickets, max_in_flight=concurrency, timeout=timeout, booking_time=booking_time)
+    results = asyncio.run(service.book_all(passengers, 12345))
+    return results, latencies, time.perf_counter() - start, 0
+
+
+def _confirm_in_process(booking_time, timeout):
+    # like asyncio.wait_for: stop waiting after `timeout` seconds.
+    # Also reports this worker's peak memory, the parent can not see it.
+    time.sleep(min(booking_time, timeout))
+    return booking_time <= timeout, os.getpid(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_processes(passengers, tickets, concurrency, booking_time, timeout):
+    latencies = []
+    inventory = TicketInventory(tickets)
+    results = []
+    worker_peaks = {}  # pid -> ru_maxrss
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=concurrency) as pool:
+        futures = {}
+        for passenger in passengers:
+            if inventory.take():
+                futures[pool.submit(_confirm_in_process, booking_time, timeout)] = passenger
+            else:
+                results.append(BookingResult(passenger, 12345, False, "All tickets are sold"))
+                latencies.append(time.perf_counter() - start)
+        for future in concurrent.futures.as_completed(futures):
+            confirmed, pid, peak = future.result()
+            worker_peaks[pid] = max(peak, worker_peaks.get(pid, 0))
+            passenger = futures[future]
+            if confirmed:
+                results.append(BookingResult(passenger, 12345, True, "Ticket is booked"))
+            else:
+                inventory.release()  # give the ticket back
+                results.append(BookingResult(passenger, 12345, False, f"Booking timed out for {passenger}"))
+            latencies.append(time.perf_counter() - start)
+    return results, latencies, time.perf_counter() - start, sum(worker_peaks.values())
+
+
+MODES = {"threads": _run_threads, "asyncio": _run_asyncio, "processes": _run_processes}
+
+
+def _to_mb(maxrss):
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def _measure(mode, passengers, tickets, concurrency, booking_time, timeout, out):
+    results, latencies, elapsed, workers = MODES[mode](passengers, tickets, concurrency, booking_time, timeout)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    out.put((mode, sum(1 for r in results if r.booked), elapsed, _to_mb(peak), _to_mb(workers),
+             _percentile(latencies, 50), _percentile(latencies, 99)))
+
+
+def compare(passenger_count=5000, tickets=4000, concurrency=500, booking_time=0.05, timeout=5.0):
+    # every mode runs `concurrency` bookings at once with the same timeout.
+    # "workers MB" adds up the peak RSS of every pool process; forked workers
+    # share pages with the parent, so it is an upper bound.
+    passengers = [f"Passenger-{i}" for i in range(passenger_count)]
+    print(f"{passenger_count} passengers, {tickets} tickets, concurrency {concurrency}, timeout {timeout}s")
+    print("mode      | booked | seconds | main MB | workers MB | p50 ms  | p99 ms")
+    for mode in MODES:
+        # fresh process per mode -> clean peak memory numbers
+        out = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_measure,
+                                       args=(mode, passengers, tickets, concurrency, booking_time, timeout, out))
+        proc.start()
+        mode, booked, elapsed, main_mb, workers_mb, p50, p99 = out.get()
+        proc.join()
+        print(f"{mode:9} | {booked:6} | {elapsed:7.2f} | {main_mb:7.1f} | {workers_mb:10.1f} | "
+              f"{p50 * 1000:7.1f} | {p99 * 1000:7.1f}")
+
+
+if __name__ == "__main__":
+    passengers = ["Ramesh", "Suresh", "Mahesh", "Mukesh", "Ganesh", "Dinesh", "Rithesh", "Hitesh"]
+    service = AsyncBookingService(5, max_in_flight=4)
+    for result in asyncio.run(service.book_all(passengers, 12345)):
+        print(result.message)
+
+    compare()
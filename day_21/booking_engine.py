@@ -0,0 +1,154 @@
+# Ticket booking engine
+#
+# demo2.py starts a thread and joins it in the same loop, so bookings run
+# one after another, and the commented total_available_tickets check is a
+# race. Here a fixed pool of worker threads takes requests from a bounded
+# queue, and the ticket count is changed only under a lock, so a train is
+# never oversold.
+#
+# An optional limiter (anything with allow(key), e.g. RateLimiter from
+# day_23_networking/rate_limiter.py) rejects requests before they are queued,
+# so a burst is shed early instead of waiting in the queue forever.
+
+import queue
+import threading
+import time
+
+
+class TicketInventory:
+    def __init__(self, total_available_tickets):
+        self.available = total_available_tickets
+        self.lock = threading.Lock()
+
+    def take(self):
+        # check + decrement together -> no overselling
+        with self.lock:
+            if self.available > 0:
+                self.available -= 1
+                return True
+            return False
+
+    def release(self):
+        with self.lock:
+            self.available += 1
+
+
+class BookingResult:
+    def __init__(self, passenger_name, train_number, booked, message):
+        self.passenger_name = passenger_name
+        self.train_number = train_number
+        self.booked = booked
+        self.message = message
+
+    def __repr__(self):
+        return f"BookingResult({self.passenger_name!r}, {self.train_number}, booked={self.booked})"
+
+
+_STOP = object()
+
+
+class _Batch:
+    # the requests of one book_all() call; done is set when all are answered
+    def __init__(self, size):
+        self.results = [None] * size
+        self.pending = 1  # 1 = still queueing, see book_all
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def add(self):
+        with self.lock:
+            self.pending += 1
+
+    def finish(self):
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.done.set()
+
+
+class BookingEngine:
+    def __init__(self, inventory, workers=8, queue_size=1000, booking_time=1/2, limiter=None):
+        self.inventory = inventory
+        self.limiter = limiter
+        self.booking_time = booking_time  # stands in for payment / IRCTC call
+        self.requests = queue.Queue(maxsize=queue_size)
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def book_train_ticket(self, passenger_name, train_number):
+        if not self.inventory.take():
+            return BookingResult(passenger_name, train_number, False,
+                                 f"All tickets are sold on train {train_number}")
+        try:
+            if self.booking_time:
+                time.sleep(self.booking_time)
+            return BookingResult(passenger_name, train_number, True,
+                                 f"Ticket is booked successfully for {passenger_name} on train {train_number}")
+        except Exception:
+            self.inventory.release()  # booking failed -> the ticket is free again
+            raise
+
+    def _worker(self):
+        while True:
+            item = self.requests.get()
+            if item is _STOP:
+                self.requests.task_done()
+                return
+            passenger_name, train_number, batch, index = item
+            try:
+                batch.results[index] = self.book_train_ticket(passenger_name, train_number)
+            except Exception as e:
+                batch.results[index] = BookingResult(passenger_name, train_number, False, f"Booking failed: {e}")
+            finally:
+                batch.finish()
+                self.requests.task_done()
+
+    def book_all(self, passengers, train_number):
+        # returns one result per passenger, in the same order. Waits only for
+        # its own passengers: other callers may share the queue.
+        batch = _Batch(len(passengers))
+        results = batch.results
+        for index, passenger_name in enumerate(passengers):
+            if self.limiter is not None and not self.limiter.allow(passenger_name):
+                results[index] = BookingResult(passenger_name, train_number, False,
+                                               "Booking rejected: too many requests, try again later")
+                continue
+            batch.add()
+            # blocks when the queue is full -> memory stays bounded
+            self.requests.put((passenger_name, train_number, batch, index))
+        batch.finish()  # the caller's own count: all requests are queued now
+        batch.done.wait()
+        return results
+
+    def shutdown(self):
+        for _ in self.threads:
+            self.requests.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+
+
+def benchmark(workers=16, booking_time=0.0):
+    train = 12345
+    for count in (10, 100, 1000, 10000, 100000):
+        passengers = [f"Passenger-{i}" for i in range(count)]
+        tickets = count // 2
+        engine = BookingEngine(TicketInventory(tickets), workers=workers, booking_time=booking_time)
+        start = time.perf_counter()
+        results = engine.book_all(passengers, train)
+        elapsed = time.perf_counter() - start
+        engine.shutdown()
+        booked = sum(1 for r in results if r.booked)
+        print(f"{count:6} passengers: {count / elapsed:10.0f} bookings/s, "
+              f"booked {booked}/{tickets} tickets, oversold: {booked > tickets}")
+
+
+if __name__ == "__main__":
+    passengers = ["Ramesh", "Suresh", "Mahesh", "Mukesh", "Ganesh", "Dinesh", "Rithesh", "Hitesh"]
+    engine = BookingEngine(TicketInventory(5), workers=4)
+    for result in engine.book_all(passengers, 12345):
+        print(result.message)
+    engine.shutdown()
+    print("All bookings are complete")
+
+    benchmark()
@@ -0,0 +1,257 @@
+# Instrumented Lock / RLock for finding lock hot spots
+#
+# Drop-in replacement for threading.Lock / threading.RLock that records,
+# per lock name, how long threads waited to get the lock and how long they
+# held it. Times go into log2 histograms (bucket i = up to 2**i ns), so
+# recording is a couple of integer operations.
+#
+# The statistics of one lock are only changed while that lock is held, so
+# the lock itself protects them and no extra lock is needed.
+#
+# Sampling mode: with sample_every=N only every Nth acquisition is timed,
+# which keeps the overhead low enough for production. No sys.setprofile.
+
+import threading
+import time
+
+BUCKETS = 48  # 2**47 ns is more than a day
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        self.buckets[min(ns.bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other):
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        # upper bound of the bucket holding the percentile, in ns
+        if not self.count:
+            return 0
+        target = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return (1 << i) if i else 0
+        return self.max
+
+
+class LockStats:
+    def __init__(self, name):
+        self.name = name
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait = Histogram()
+        self.hold = Histogram()
+
+
+class LockRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = []
+
+    def register(self, name):
+        stats = LockStats(name)
+        with self.lock:
+            self.stats.append(stats)
+        return stats
+
+    def report(self):
+        # name -> summary dict, locks with the same name are merged
+        with self.lock:
+            all_stats = list(self.stats)
+        merged = {}
+        for stats in all_stats:
+            total = merged.get(stats.name)
+            if total is None:
+                total = merged[stats.name] = LockStats(stats.name)
+            total.acquisitions += stats.acquisitions
+            total.contended += stats.contended
+            total.wait.merge(stats.wait)
+            total.hold.merge(stats.hold)
+
+        report = {}
+        for name, stats in merged.items():
+            report[name] = {
+                "acquisitions": stats.acquisitions,
+                "contended": stats.contended,
+                "timed": stats.wait.count,
+                "wait_total_ms": stats.wait.total / 1e6,
+                "wait_p50_us": stats.wait.percentile(50) / 1e3,
+                "wait_p99_us": stats.wait.percentile(99) / 1e3,
+                "wait_max_us": stats.wait.max / 1e3,
+                "hold_p50_us": stats.hold.percentile(50) / 1e3,
+                "hold_p99_us": stats.hold.percentile(99) / 1e3,
+                "hold_max_us": stats.hold.max / 1e3,
+            }
+        return report
+
+    def printReport(self):
+        report = self.report()
+        ordered = sorted(report.items(), key=lambda item: item[1]["wait_total_ms"], reverse=True)
+        print(f"{'lock':20} {'acq':>8} {'contended':>9} {'wait ms':>9} {'wait p99 us':>11} {'hold p99 us':>11}")
+        for name, r in ordered:
+            print(f"{name:20} {r['acquisitions']:8} {r['contended']:9} {r['wait_total_ms']:9.1f} "
+                  f"{r['wait_p99_us']:11.1f} {r['hold_p99_us']:11.1f}")
+
+    def reset(self):
+        with self.lock:
+            self.stats = []
+
+
+default_registry = LockRegistry()
+
+
+class InstrumentedLock:
+    _factory = threading.Lock
+
+    def __init__(self, name, sample_every=1, registry=None):
+        self._lock = self._factory()
+        self.name = name
+        self.sample_every = sample_every
+        self.stats = (registry or default_registry).register(name)
+        self._hold_start = None
+        self._depth = 0  # only used by the RLock version
+
+    def acquire(self, blocking=True, timeout=-1):
+        # fast path: free lock -> no wait to measure
+        if self._lock.acquire(False):
+            self._acquired(0, False)
+            return True
+        if not blocking:
+            return False
+        sampled = self.stats.acquisitions % self.sample_every == 0
+        start = time.perf_counter_ns() if sampled else 0
+        if not self._lock.acquire(True, timeout):
+            return False
+        self._acquired(time.perf_counter_ns() - start if sampled else None, True)
+        return True
+
+    def _acquired(self, wait_ns, contended):
+        # we hold the lock here -> safe to update the stats
+        self._depth += 1
+        if self._depth > 1:
+            return  # re-entered RLock, outer acquisition is already counted
+        stats = self.stats
+        if stats.acquisitions % self.sample_every == 0:
+            if wait_ns is not None:
+                stats.wait.record(wait_ns)
+            self._hold_start = time.perf_counter_ns()
+        else:
+            self._hold_start = None
+        stats.acquisitions += 1
+        if contended:
+            stats.contended += 1
+
+    def _owned(self):
+        # a plain Lock has no owner, it only has to be locked
+        return self._lock.locked()
+
+    def release(self):
+        # check first: a wrong release() must not break _depth / _hold_start
+        if not self._owned():
+            raise RuntimeError("release unlocked lock")
+        self._depth -= 1
+        if self._depth == 0 and self._hold_start is not None:
+            self.stats.hold.record(time.perf_counter_ns() - self._hold_start)
+            self._hold_start = None
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class InstrumentedRLock(InstrumentedLock):
+    _factory = threading.RLock
+
+    def locked(self):
+        return self._depth > 0
+
+    def _owned(self):
+        # only the owning thread may release an RLock
+        return self._lock._is_owned()
+
+    # threading.Condition(lock) uses these three on an RLock: wait() must
+    # release every level of recursion and take all of them back afterwards
+
+    def _is_owned(self):
+        return self._lock._is_owned()
+
+    def _release_save(self):
+        if not self._owned():
+            raise RuntimeError("cannot release un-acquired lock")
+        depth = self._depth
+        if self._hold_start is not None:
+            self.stats.hold.record(time.perf_counter_ns() - self._hold_start)
+            self._hold_start = None
+        self._depth = 0
+        return self._lock._release_save(), depth
+
+    def _acquire_restore(self, state):
+        saved, depth = state
+        sampled = self.stats.acquisitions % self.sample_every == 0
+        start = time.perf_counter_ns() if sampled else 0
+        self._lock._acquire_restore(saved)
+        # waiting for the lock after notify() counts as a wait
+        self._acquired(time.perf_counter_ns() - start if sampled else None, False)
+        self._depth = depth
+
+
+def overhead_benchmark(rounds=200000):
+    for label, lock in (("threading.Lock", threading.Lock()),
+                        ("InstrumentedLock", InstrumentedLock("bench-full")),
+                        ("sampled 1/64", InstrumentedLock("bench-sampled", sample_every=64))):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            with lock:
+                pass
+        elapsed = time.perf_counter() - start
+        print(f"{label:17}: {elapsed / rounds * 1e9:7.0f} ns per acquire/release")
+
+
+if __name__ == "__main__":
+    # demo4_rc_solution.py with an instrumented counter_lock
+    policy_counter = 0
+    counter_lock = InstrumentedLock("counter_lock")
+
+    def process_lic_policiy(agent_name, policies_to_process):
+        global policy_counter
+        for i in range(policies_to_process):
+            with counter_lock:
+                current_count = policy_counter
+                time.sleep(0.001)
+                policy_counter = current_count + 1
+
+    agent_threads = [threading.Thread(target=process_lic_policiy, args=(agent, 100))
+                     for agent in ["Kamlesh", "Nitesh", "Hitesh"]]
+    for thread in agent_threads:
+        thread.start()
+    for thread in agent_threads:
+        thread.join()
+
+    print(f"Actual proccessed policies: {policy_counter}")
+    default_registry.printReport()
+    print()
+    overhead_benchmark()
@@ -0,0 +1,229 @@
+# Queue backed log sink for chatty threads
+#
+# CountingThread / AlphabetThread in demo1.py and process_lic_policiy print
+# one line per loop. Every print takes the stdout lock and makes a write
+# call, so with many threads most of the time goes there.
+#
+# With the sink a worker only appends (format string, args) to a deque
+# (append is atomic, no lock needed). One writer thread formats the records
+# and writes them in big batches with a single write + flush.
+#
+# What benchmark() shows (8 threads x 20000 lines to /dev/null):
+#   print (like demo1)  ~0.10s  <- block buffered file: print is the fastest
+#   print, flush=True   ~0.32s  <- one write per line, like a terminal
+#   sink                ~0.36s  <- formatting still runs under the GIL
+# So the sink does not make logging cheaper. It only helps when every line
+# is a real write (a terminal, a pipe, a slow disk): then the workers stop
+# waiting on that write and on the stdout lock, and the writer does it.
+#
+# Overload policies when the queue is full:
+#   "drop_newest" -> the new record is dropped (counted in sink.dropped, no lock -> approximate)
+#   "drop_oldest" -> the oldest waiting record is dropped
+#   "block"       -> the worker waits until there is room
+#
+# A record that cannot be formatted becomes a "<bad log record ...>" line and
+# a failed write loses that batch; both are counted in sink.errors and the
+# writer keeps running.
+
+import collections
+import os
+import sys
+import threading
+import time
+
+POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+class LogSink:
+    def __init__(self, stream=None, max_queue=100000, batch=2000, policy="drop_newest", flush_interval=0.05):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.stream = stream or sys.stdout
+        self.max_queue = max_queue
+        self.batch = batch
+        self.policy = policy
+        self.flush_interval = flush_interval
+        self.records = collections.deque()
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.wakeup = threading.Event()
+        self.room = threading.Event()
+        self.room.set()
+        self.running = True
+        self.writer = threading.Thread(target=self._write_loop, name="log-sink", daemon=True)
+        self.writer.start()
+
+    def log(self, message, *args):
+        # message is formatted later by the writer: message.format(*args)
+        records = self.records
+        if len(records) >= self.max_queue:
+            if self.policy == "drop_newest":
+                self.dropped += 1
+                return
+            if self.policy == "drop_oldest":
+                try:
+                    records.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass
+            else:
+                self.wakeup.set()
+                while len(records) >= self.max_queue and self.running:
+                    if not self.writer.is_alive():
+                        # nobody will make room any more
+                        self.dropped += 1
+                        return
+                    self.room.clear()
+                    self.room.wait(self.flush_interval)
+        records.append((message, args))
+        if len(records) >= self.batch:
+            self.wakeup.set()
+
+    def _drain(self):
+        records = self.records
+        lines = []
+        while records and len(lines) < self.batch:
+            try:
+                message, args = records.popleft()
+            except IndexError:
+                break
+            try:
+                lines.append(message.format(*args) if args else str(message))
+            except Exception as e:
+                self.errors += 1
+                lines.append(f"<bad log record {message!r} {args!r}: {e!r}>")
+        if lines:
+            count = len(lines)
+            lines.append("")
+            try:
+                self.stream.write("\n".join(lines))
+                self.stream.flush()
+                self.written += count
+            except Exception:
+                self.errors += 1
+                self.dropped += count
+            self.room.set()
+        return len(lines)
+
+    def _write_loop(self):
+        while self.running or self.records:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            while self._drain():
+                pass
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        self.writer.join()
+        self.room.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CountingThread(threading.Thread):
+    ct = "CT"
+
+    def __init__(self, sink):
+        super().__init__()
+        self.sink = sink
+
+    def run(self):
+        for i in range(1, 1000):
+            self.sink.log("{} is running: {}", self.ct, i)
+
+
+class AlphabetThread(threading.Thread):
+    ct = "AT"
+    alphbets = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+    def __init__(self, sink, pause=1 / 100):
+        super().__init__()
+        self.sink = sink
+        self.pause = pause
+
+    def run(self):
+        for j in range(1, 27):
+            for i in range(26):
+                self.sink.log("{} is running: {}:{}", self.ct, j, self.alphbets[i])
+                time.sleep(self.pause)
+
+
+def process_lic_policiy(sink, state, agent_name, policies_to_process, work_time=0.5):
+    # demo4_rc_solution.py with its prints going to the sink
+    for i in range(policies_to_process):
+        sink.log("Agent {}: Processing policy {}", agent_name, i + 1)
+        with state["lock"]:
+            current_count = state["counter"]
+            time.sleep(work_time)
+            state["counter"] = current_count + 1
+            sink.log("Agent {}: Total policies processed so far: {}", agent_name, state["counter"])
+
+
+def benchmark(threads=8, lines_per_thread=20000):
+    devnull = open(os.devnull, "w")
+
+    def with_print(flush):
+        for i in range(lines_per_thread):
+            print(f"Agent is running: {i}", file=devnull, flush=flush)
+
+    print_times = []
+    for flush in (False, True):
+        start = time.perf_counter()
+        workers = [threading.Thread(target=with_print, args=(flush,)) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        print_times.append(time.perf_counter() - start)
+
+    sink = LogSink(stream=devnull, max_queue=threads * lines_per_thread)
+
+    def with_sink():
+        for i in range(lines_per_thread):
+            sink.log("Agent is running: {}", i)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=with_sink) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    worker_time = time.perf_counter() - start
+    sink.close()
+    total_time = time.perf_counter() - start
+    devnull.close()
+
+    lines = threads * lines_per_thread
+    print(f"{lines} lines from {threads} threads")
+    print(f"print (like demo1)  : {print_times[0]:.3f}s")
+    print(f"print, flush=True   : {print_times[1]:.3f}s")
+    print(f"sink (workers done) : {worker_time:.3f}s")
+    print(f"sink (all written)  : {total_time:.3f}s, written {sink.written}, dropped {sink.dropped}")
+
+
+if __name__ == "__main__":
+    # demo1.py and demo4_rc_solution.py with all prints going to the sink
+    with LogSink() as sink:
+        t1 = CountingThread(sink)
+        t2 = AlphabetThread(sink)
+        t2.start()
+        t1.start()
+        t1.join()
+        t2.join()
+
+        state = {"counter": 0, "lock": threading.Lock()}
+        agents = ["Kamlesh", "Nitesh", "Hitesh"]
+        agent_threads = [threading.Thread(target=process_lic_policiy, args=(sink, state, agent, 20, 0.01))
+                         for agent in agents]
+        for thread in agent_threads:
+            thread.start()
+        for thread in agent_threads:
+            thread.join()
+        sink.log("Actual proccessed policies: {}", state["counter"])
+    benchmark()
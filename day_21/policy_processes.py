@@ -0,0 +1,116 @@
+# LIC policy processing with processes instead of threads
+#
+# Threads in demo3/demo4 share one GIL, so real (CPU heavy) policy checks
+# run one at a time. Here every agent is a separate process. Progress is
+# reported through a multiprocessing.shared_memory block with one 64-bit
+# slot per agent: an agent only writes its own slot, so no lock is needed,
+# and it writes only every `batch` policies to keep cross-process traffic low.
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+SLOT = 8  # bytes per counter
+
+
+def validate_policy(policy_number, rounds=2000):
+    # stands in for real CPU bound validation work
+    digest = str(policy_number).encode("utf-8")
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest
+
+
+def process_lic_policiy(shm_name, slot, agent_name, policies_to_process, batch=50):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    counters = shm.buf.cast("q")
+    try:
+        pending = 0
+        for i in range(policies_to_process):
+            validate_policy(f"{agent_name}-{i}")
+            pending += 1
+            if pending == batch:
+                counters[slot] += pending  # only this process writes this slot
+                pending = 0
+        counters[slot] += pending
+    finally:
+        counters.release()
+        shm.close()
+
+
+class PolicyProgress:
+    def __init__(self, agents):
+        self.agents = agents
+        self.shm = shared_memory.SharedMemory(create=True, size=SLOT * agents)
+        self.counters = self.shm.buf.cast("q")
+        for i in range(agents):
+            self.counters[i] = 0
+
+    def total(self):
+        return sum(self.counters[i] for i in range(self.agents))
+
+    def close(self):
+        self.counters.release()
+        self.shm.close()
+        self.shm.unlink()
+
+
+def run_processes(agents, policy_count, batch=50, show_progress=False):
+    progress = PolicyProgress(len(agents))
+    try:
+        workers = [multiprocessing.Process(target=process_lic_policiy,
+                                           args=(progress.shm.name, slot, agent, policy_count, batch))
+                   for slot, agent in enumerate(agents)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        while any(worker.is_alive() for worker in workers):
+            if show_progress:
+                print(f"Processed so far: {progress.total()}")
+            time.sleep(0.2)
+        for worker in workers:
+            worker.join()
+        return progress.total(), time.perf_counter() - start
+    finally:
+        progress.close()
+
+
+def run_threads(agents, policy_count):
+    done = [0] * len(agents)
+
+    def work(slot, agent):
+        for i in range(policy_count):
+            validate_policy(f"{agent}-{i}")
+            done[slot] += 1
+
+    threads = [threading.Thread(target=work, args=(slot, agent)) for slot, agent in enumerate(agents)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done), time.perf_counter() - start
+
+
+def benchmark(policy_count=200):
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores})
+    print("agents | threads policies/s | processes policies/s | totals exact")
+    for count in counts:
+        agents = [f"Agent-{i}" for i in range(count)]
+        thread_total, thread_time = run_threads(agents, policy_count)
+        process_total, process_time = run_processes(agents, policy_count)
+        expected = count * policy_count
+        exact = thread_total == expected and process_total == expected
+        print(f"{count:6} | {thread_total / thread_time:18.0f} | {process_total / process_time:20.0f} | {exact}")
+
+
+if __name__ == "__main__":
+    agents = ["Kamlesh", "Nitesh", "Hitesh"]
+    total, elapsed = run_processes(agents, 300, show_progress=True)
+    print(f"Actual proccessed policies: {total} in {elapsed:.2f}s")
+
+    benchmark()
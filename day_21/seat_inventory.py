@@ -0,0 +1,170 @@
+# Segment aware seat inventory
+#
+# A train stops at stations 0..n-1. A booking from station a to station b
+# uses the segment [a, b). Each seat keeps its occupied segments as bits of
+# one integer (bit i = segment i..i+1 is sold), so the same seat can be
+# sold again for a journey that does not overlap.
+#
+# Each coach also keeps the transposed view: for every segment one integer
+# with a bit per free seat. ANDing those columns for a..b-1 gives every
+# seat of the coach that is free for the whole journey in one pass.
+#
+#   mask for [a, b) = (1 << b) - (1 << a)
+#   seat is free for [a, b) when seat_mask & mask == 0
+
+import random
+import threading
+import time
+
+
+def segment_mask(a, b):
+    return (1 << b) - (1 << a)
+
+
+class SeatInventory:
+    def __init__(self, coaches=22, seats_per_coach=72, stations=32, best_fit=True):
+        if stations < 2:
+            raise ValueError("A train needs at least two stations")
+        self.coaches = coaches
+        self.seats_per_coach = seats_per_coach
+        self.stations = stations
+        self.best_fit = best_fit
+        self.seats = [[0] * seats_per_coach for _ in range(coaches)]
+        all_seats = (1 << seats_per_coach) - 1
+        self.free = [[all_seats] * (stations - 1) for _ in range(coaches)]
+        self.lock = threading.Lock()
+
+    def _check(self, a, b):
+        if not 0 <= a < b <= self.stations - 1:
+            raise ValueError(f"Invalid journey {a} -> {b}")
+
+    def _gap(self, seat_mask, a, b):
+        # size of the free gap around [a, b) -> smaller means less fragmentation
+        below = seat_mask & ((1 << a) - 1)
+        start = below.bit_length()
+        above = seat_mask >> b
+        end = b + (above & -above).bit_length() - 1 if above else self.stations - 1
+        return end - start
+
+    def _candidates(self, coach, a, b):
+        # bit per seat that is free for every segment in [a, b)
+        columns = self.free[coach]
+        free = columns[a]
+        for segment in range(a + 1, b):
+            free &= columns[segment]
+            if not free:
+                break
+        return free
+
+    def _find(self, coach, a, b):
+        free = self._candidates(coach, a, b)
+        if not free:
+            return None, None
+        if not self.best_fit:
+            return (free & -free).bit_length() - 1, 0
+
+        # exact fit: booked (or end of line) just before a and just after b
+        columns = self.free[coach]
+        exact = free
+        if a > 0:
+            exact &= ~columns[a - 1]
+        if b < self.stations - 1:
+            exact &= ~columns[b]
+        if exact:
+            return (exact & -exact).bit_length() - 1, b - a
+
+        seats = self.seats[coach]
+        best_seat = None
+        best_gap = None
+        while free:
+            low = free & -free
+            seat = low.bit_length() - 1
+            free ^= low
+            gap = self._gap(seats[seat], a, b)
+            if best_gap is None or gap < best_gap:
+                best_seat, best_gap = seat, gap
+        return best_seat, best_gap
+
+    def _mark(self, coach, seat, a, b, booked):
+        bit = 1 << seat
+        columns = self.free[coach]
+        for segment in range(a, b):
+            if booked:
+                columns[segment] &= ~bit
+            else:
+                columns[segment] |= bit
+
+    def allocate(self, a, b, coach=None):
+        # returns (coach, seat) or None when the journey can not be seated
+        self._check(a, b)
+        mask = segment_mask(a, b)
+        coaches = range(self.coaches) if coach is None else [coach]
+        with self.lock:
+            best = None
+            for c in coaches:
+                seat, gap = self._find(c, a, b)
+                if seat is None:
+                    continue
+                if best is None or gap < best[2]:
+                    best = (c, seat, gap)
+                    if not self.best_fit or gap == b - a:
+                        break
+            if best is None:
+                return None
+            c, seat, _ = best
+            self.seats[c][seat] |= mask
+            self._mark(c, seat, a, b, True)
+            return c, seat
+
+    def cancel(self, coach, seat, a, b):
+        self._check(a, b)
+        mask = segment_mask(a, b)
+        with self.lock:
+            if self.seats[coach][seat] & mask != mask:
+                raise ValueError(f"Coach {coach} seat {seat} is not booked for {a} -> {b}")
+            self.seats[coach][seat] &= ~mask
+            self._mark(coach, seat, a, b, False)
+
+    def isFree(self, coach, seat, a, b):
+        return not self.seats[coach][seat] & segment_mask(a, b)
+
+    def utilization(self):
+        # fraction of seat-segments sold
+        used = sum(bin(m).count("1") for coach in self.seats for m in coach)
+        return used / (self.coaches * self.seats_per_coach * (self.stations - 1))
+
+
+def benchmark(requests=60000, stations=32, seed=7):
+    rng = random.Random(seed)
+    journeys = []
+    for _ in range(requests):
+        a = rng.randrange(0, stations - 1)
+        b = rng.randrange(a + 1, min(stations, a + 12))
+        journeys.append((a, b))
+
+    for best_fit in (False, True):
+        inventory = SeatInventory(stations=stations, best_fit=best_fit)
+        booked = []
+        start = time.perf_counter()
+        for i, (a, b) in enumerate(journeys):
+            seat = inventory.allocate(a, b)
+            if seat:
+                booked.append((seat, a, b))
+            # some passengers cancel
+            if booked and i % 10 == 0:
+                (coach, number), ca, cb = booked.pop(rng.randrange(len(booked)))
+                inventory.cancel(coach, number, ca, cb)
+        elapsed = time.perf_counter() - start
+        mode = "best fit " if best_fit else "first fit"
+        print(f"{mode}: {requests / elapsed:9.0f} requests/s, seated {len(booked)}, "
+              f"utilization {inventory.utilization():.1%}")
+
+
+if __name__ == "__main__":
+    inventory = SeatInventory(coaches=1, seats_per_coach=2, stations=5)
+    print(inventory.allocate(0, 2))  # Delhi -> Kanpur
+    print(inventory.allocate(2, 4))  # Kanpur -> Patna, same seat again
+    print(inventory.allocate(1, 3))  # overlaps -> next seat
+    print(inventory.allocate(0, 4))  # no seat left for the full journey
+
+    benchmark()
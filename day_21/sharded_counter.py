@@ -0,0 +1,108 @@
+# Sharded counter for the LIC policy demo
+#
+# demo4_rc_solution.py keeps counter_lock while it reads, sleeps and writes,
+# so only one agent can work at a time. Here every thread gets its own
+# shard (a one element list) that only that thread writes to. Reading the
+# counter adds up all shards, so the total is always exact.
+#
+# A thread that is done calls release(): its shard is added to `retired`
+# and dropped, so one thread per agent does not grow the shard list forever
+# (same as the metrics in day_23_networking/metrics.py).
+
+import threading
+import time
+
+
+class ShardedCounter:
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = []
+        self.retired = 0  # total of the released shards
+        self.lock = threading.Lock()  # only used when a thread starts or stops
+
+    def _shard(self):
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = [0]
+            self.local.shard = shard
+            with self.lock:
+                self.shards.append(shard)
+        return shard
+
+    def increment(self, amount=1):
+        # no lock: nobody else writes to this thread's shard
+        self._shard()[0] += amount
+
+    def release(self):
+        # call at the end of the thread: fold its shard into `retired`
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            return
+        self.local.shard = None
+        with self.lock:
+            self.shards.remove(shard)
+            self.retired += shard[0]
+
+    def value(self):
+        with self.lock:
+            shards = list(self.shards)
+            retired = self.retired
+        return retired + sum(shard[0] for shard in shards)
+
+
+def process_with_global_lock(state, agent_name, policies_to_process, work_time):
+    for i in range(policies_to_process):
+        with state["lock"]:
+            current_count = state["counter"]
+            time.sleep(work_time)
+            state["counter"] = current_count + 1
+
+
+def process_with_short_lock(state, agent_name, policies_to_process, work_time):
+    # the fair baseline: same work outside the lock, lock only for the +1
+    for i in range(policies_to_process):
+        time.sleep(work_time)
+        with state["lock"]:
+            state["counter"] += 1
+
+
+def process_with_shards(counter, agent_name, policies_to_process, work_time):
+    for i in range(policies_to_process):
+        time.sleep(work_time)  # processing does not need the counter
+        counter.increment()
+    counter.release()
+
+
+def _run(target, shared, agents, policy_count, work_time):
+    threads = [threading.Thread(target=target, args=(shared, f"Agent-{i}", policy_count, work_time))
+               for i in range(agents)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def benchmark(policy_count=20, work_time=0.001):
+    # "global lock" sleeps inside the lock like demo4_rc_solution.py,
+    # "short lock" does the same work as the shards and only locks the +1
+    print("agents | global lock policies/s | short lock policies/s | sharded policies/s | totals exact")
+    for agents in (1, 2, 4, 8, 16, 32, 64):
+        state = {"counter": 0, "lock": threading.Lock()}
+        locked_time = _run(process_with_global_lock, state, agents, policy_count, work_time)
+
+        short = {"counter": 0, "lock": threading.Lock()}
+        short_time = _run(process_with_short_lock, short, agents, policy_count, work_time)
+
+        counter = ShardedCounter()
+        sharded_time = _run(process_with_shards, counter, agents, policy_count, work_time)
+
+        expected = agents * policy_count
+        exact = state["counter"] == short["counter"] == counter.value() == expected
+        print(f"{agents:6} | {expected / locked_time:22.0f} | {expected / short_time:21.0f} | "
+              f"{expected / sharded_time:18.0f} | {exact}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,161 @@
+# RAC / waitlist engine for sold out trains
+#
+# Passengers that could not get a ticket wait in a heap ordered by
+# (quota priority, booking time). When a confirmed ticket is cancelled the
+# first passenger in the heap is promoted.
+#
+# Cancelling a waitlisted request only marks its heap entry as removed
+# (lazy deletion); removed entries are skipped when they reach the top, and
+# the heap is rebuilt when more than half of it is dead entries.
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from booking_engine import TicketInventory
+
+# smaller number -> promoted first
+QUOTA_PRIORITY = {"RAC": 0, "LADIES": 1, "SENIOR": 1, "TATKAL": 2, "GENERAL": 3}
+
+_REMOVED = None
+
+
+class Waitlist:
+    def __init__(self, quota_priority=None):
+        self.quota_priority = quota_priority or QUOTA_PRIORITY
+        self.heap = []
+        self.entries = {}  # request id -> heap entry
+        self.dead = 0
+        self.sequence = itertools.count()  # booking order, ties broken by arrival
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, request_id, passenger_name, quota="GENERAL"):
+        if quota not in self.quota_priority:
+            raise ValueError(f"Unknown quota: {quota}")
+        with self.lock:
+            if request_id in self.entries:
+                raise ValueError(f"Request {request_id} is already waitlisted")
+            entry = [self.quota_priority[quota], next(self.sequence), request_id, passenger_name]
+            self.entries[request_id] = entry
+            heapq.heappush(self.heap, entry)
+
+    def cancel(self, request_id):
+        with self.lock:
+            entry = self.entries.pop(request_id, None)
+            if entry is None:
+                return False
+            entry[2] = _REMOVED
+            self.dead += 1
+            if self.dead > len(self.heap) // 2:
+                self._compact()
+            return True
+
+    def _compact(self):
+        self.heap = [entry for entry in self.heap if entry[2] is not _REMOVED]
+        heapq.heapify(self.heap)
+        self.dead = 0
+
+    def promote(self, seats=1):
+        # called when `seats` confirmed tickets were cancelled,
+        # one lock acquisition for the whole batch
+        promoted = []
+        with self.lock:
+            heap = self.heap
+            while heap and len(promoted) < seats:
+                entry = heapq.heappop(heap)
+                if entry[2] is _REMOVED:
+                    self.dead -= 1
+                    continue
+                del self.entries[entry[2]]
+                promoted.append((entry[2], entry[3]))
+        return promoted
+
+    def position(self, request_id):
+        # O(n), meant for showing "WL 12" to a passenger, not for hot paths
+        with self.lock:
+            entry = self.entries.get(request_id)
+            if entry is None:
+                return None
+            return 1 + sum(1 for e in self.entries.values() if e[:2] < entry[:2])
+
+
+class WaitlistedTrain:
+    # booking + cancellation flow on top of TicketInventory
+    def __init__(self, train_number, total_available_tickets):
+        self.train_number = train_number
+        self.inventory = TicketInventory(total_available_tickets)
+        self.waitlist = Waitlist()
+        self.confirmed = set()
+        self.lock = threading.Lock()
+
+    def book(self, request_id, passenger_name, quota="GENERAL"):
+        # train lock -> a seat can not be freed between "sold out" and "waitlisted"
+        with self.lock:
+            if self.inventory.take():
+                self.confirmed.add(request_id)
+                return "CONFIRMED"
+            self.waitlist.add(request_id, passenger_name, quota)
+            return "WAITLISTED"
+
+    def cancel(self, request_ids):
+        # many cancellations at once -> one batched promotion
+        with self.lock:
+            freed = 0
+            for request_id in request_ids:
+                if request_id in self.confirmed:
+                    self.confirmed.discard(request_id)
+                    freed += 1
+                else:
+                    self.waitlist.cancel(request_id)
+            promoted = self.waitlist.promote(freed)
+            for request_id, _ in promoted:
+                self.confirmed.add(request_id)
+            # seats nobody was waiting for go back to the inventory
+            for _ in range(freed - len(promoted)):
+                self.inventory.release()
+            return promoted
+
+
+def benchmark(waitlisted=1000000, cancellations=200000, releases=200000, batch=100):
+    rng = random.Random(3)
+    quotas = list(QUOTA_PRIORITY)
+    waitlist = Waitlist()
+
+    start = time.perf_counter()
+    for i in range(waitlisted):
+        waitlist.add(i, f"Passenger-{i}", rng.choice(quotas))
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for request_id in rng.sample(range(waitlisted), cancellations):
+        waitlist.cancel(request_id)
+    cancel_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    promoted = 0
+    for _ in range(releases // batch):
+        promoted += len(waitlist.promote(batch))
+    promote_time = time.perf_counter() - start
+
+    print(f"add     {waitlisted:8}: {waitlisted / add_time:10.0f} ops/s")
+    print(f"cancel  {cancellations:8}: {cancellations / cancel_time:10.0f} ops/s")
+    print(f"promote {promoted:8}: {promoted / promote_time:10.0f} ops/s (batches of {batch})")
+    print(f"still waiting: {len(waitlist)}")
+
+
+if __name__ == "__main__":
+    train = WaitlistedTrain(12345, 2)
+    print(train.book(1, "Ramesh"))
+    print(train.book(2, "Suresh"))
+    print(train.book(3, "Mahesh", "GENERAL"))
+    print(train.book(4, "Mukesh", "RAC"))
+    print(train.book(5, "Ganesh", "SENIOR"))
+    print(f"Promoted: {train.cancel([1])}")  # RAC passenger goes first
+    print(f"Promoted: {train.cancel([2, 5])}")
+
+    benchmark()
@@ -0,0 +1,120 @@
+# Work stealing scheduler for uneven agent workloads
+#
+# In demo3/demo4 every agent gets the same policy_count. Real batches are
+# uneven, so with one thread per agent some threads finish early and sit
+# idle while others are still busy.
+#
+# Every worker has its own deque of small tasks. A worker takes work from
+# the head of its own deque (newest first) and, when that is empty, steals
+# from the tail of another worker's deque (oldest first). deque.pop() and
+# deque.popleft() are atomic, so no locks are needed.
+
+import collections
+import random
+import threading
+import time
+
+
+class WorkStealingScheduler:
+    def __init__(self, workers=4, seed=None):
+        self.workers = workers
+        self.deques = [collections.deque() for _ in range(workers)]
+        self.done = [0] * workers
+        self.stolen = [0] * workers
+        self.errors = []
+        self.rng = random.Random(seed)
+        self.next_worker = 0
+
+    def submit(self, fn, *args, worker=None):
+        # without worker= tasks are spread round robin
+        if worker is None:
+            worker = self.next_worker
+            self.next_worker = (self.next_worker + 1) % self.workers
+        self.deques[worker].append((fn, args))
+
+    def _steal(self, me):
+        start = self.rng.randrange(self.workers)
+        for offset in range(self.workers):
+            victim = (start + offset) % self.workers
+            if victim == me:
+                continue
+            try:
+                task = self.deques[victim].popleft()  # tail = oldest
+            except IndexError:
+                continue
+            self.stolen[me] += 1
+            return task
+        return None
+
+    def _worker(self, me):
+        own = self.deques[me]
+        while True:
+            try:
+                fn, args = own.pop()  # head = newest
+            except IndexError:
+                task = self._steal(me)
+                if task is None:
+                    return  # nothing left anywhere
+                fn, args = task
+            try:
+                fn(*args)
+            except Exception as e:
+                self.errors.append(e)
+            self.done[me] += 1
+
+    def run(self):
+        threads = [threading.Thread(target=self._worker, args=(i,)) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(self.done)
+
+
+def process_policies(agent_name, first_policy, count, work_time):
+    for i in range(count):
+        time.sleep(work_time)  # stands in for processing one policy
+
+
+def skewed_batches(agents, total, seed=1):
+    # a few agents get most of the policies
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) ** 1.5 for i in range(agents)]
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    return [max(1, int(w * scale)) for w in weights]
+
+
+def run_static(batches, work_time):
+    threads = [threading.Thread(target=process_policies, args=(f"Agent-{i}", 0, count, work_time))
+               for i, count in enumerate(batches)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_stealing(batches, work_time, chunk=5):
+    scheduler = WorkStealingScheduler(workers=len(batches), seed=0)
+    for agent, count in enumerate(batches):
+        for first in range(0, count, chunk):
+            scheduler.submit(process_policies, f"Agent-{agent}", first, min(chunk, count - first), work_time,
+                             worker=agent)
+    start = time.perf_counter()
+    scheduler.run()
+    return time.perf_counter() - start, sum(scheduler.stolen)
+
+
+def benchmark(agents=8, total_policies=2000, work_time=0.001):
+    batches = skewed_batches(agents, total_policies)
+    print(f"policies per agent: {batches}")
+    static_time = run_static(batches, work_time)
+    stealing_time, stolen = run_stealing(batches, work_time)
+    print(f"static partitioning: {static_time:.2f}s")
+    print(f"work stealing      : {stealing_time:.2f}s ({stolen} tasks stolen)")
+
+
+if __name__ == "__main__":
+    benchmark()
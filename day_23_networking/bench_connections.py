@@ -0,0 +1,101 @@
+# Connection scaling benchmark: thread per customer vs asyncio server
+#
+# Starts d2_server.py in a separate process, opens N customer connections
+# from an asyncio client, keeps them all open (idle), then sends one message
+# on every connection (active). Prints connect time, message rate and the
+# server's memory and thread count from /proc (Linux).
+#
+#   python bench_connections.py 1000 5000 10000
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from d2_server import raise_fd_limit
+from framing import read_message_async, write_messages_async
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def server_stats(pid):
+    stats = {}
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "Threads"):
+                    stats[key] = value.strip()
+    except OSError:
+        pass
+    return stats
+
+
+async def open_customer(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    await read_message_async(reader)  # welcome message
+    return reader, writer
+
+
+async def run_clients(host, port, connections, batch=500):
+    customers = []
+    start = time.perf_counter()
+    errors = 0
+    for first in range(0, connections, batch):
+        results = await asyncio.gather(
+            *[open_customer(host, port) for _ in range(min(batch, connections - first))],
+            return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                errors += 1
+            else:
+                customers.append(result)
+    connect_time = time.perf_counter() - start
+
+    async def talk(reader, writer):
+        write_messages_async(writer, ["Hi, I need help in order status"])
+        await writer.drain()
+        return await read_message_async(reader)
+
+    start = time.perf_counter()
+    replies = await asyncio.gather(*[talk(r, w) for r, w in customers], return_exceptions=True)
+    active_time = time.perf_counter() - start
+    errors += sum(1 for reply in replies if isinstance(reply, Exception))
+    return customers, connect_time, active_time, errors
+
+
+def run(mode, connections, port):
+    server = subprocess.Popen(
+        [sys.executable, "d2_server.py", "--mode", mode, "--port", str(port),
+         "--backlog", "4096", "--quiet"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)  # let the server start
+        idle_stats = server_stats(server.pid)
+
+        async def scenario():
+            customers, connect_time, active_time, errors = await run_clients("localhost", port, connections)
+            stats = server_stats(server.pid)
+            for _, writer in customers:
+                writer.close()
+            return len(customers), connect_time, active_time, errors, stats
+
+        held, connect_time, active_time, errors, stats = asyncio.run(scenario())
+        print(f"{mode:8} | {connections:6} | {held:6} | {connect_time:8.2f} | "
+              f"{held / active_time if active_time else 0:9.0f} | {errors:6} | "
+              f"{idle_stats.get('VmRSS', '?'):>10} -> {stats.get('VmRSS', '?'):>10} | {stats.get('Threads', '?'):>7}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    counts = [int(n) for n in sys.argv[1:]] or [1000, 5000, 10000]
+    print("mode     | target | held   | connect s | msgs/s    | errors | server RSS (start -> loaded) | threads")
+    port = 9100
+    for connections in counts:
+        for mode in ("thread", "asyncio"):
+            port += 1
+            run(mode, connections, port)
@@ -0,0 +1,54 @@
+# Throughput vs cores for the prefork server (localhost)
+#
+# For 1, 2, 4 ... worker processes: start `d2_server.py --mode prefork`,
+# run several load_generator.py processes against it at full speed and add
+# up their throughput. The load generators need CPU too, so on a small
+# machine the numbers flatten out early.
+#
+#   python bench_cores.py --duration 5 --clients 4
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench_connections import HERE
+
+
+def run(processes, clients, connections, duration, port):
+    server = subprocess.Popen(
+        [sys.executable, "d2_server.py", "--mode", "prefork", "--processes", str(processes),
+         "--port", str(port), "--backlog", "4096", "--quiet", "--grace", "1"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0 + 0.2 * processes)
+        loaders = [subprocess.Popen(
+            [sys.executable, "load_generator.py", "--port", str(port), "--connections", str(connections),
+             "--rate", "0", "--duration", str(duration)],
+            cwd=HERE, stdout=subprocess.PIPE, text=True) for _ in range(clients)]
+        reports = [json.loads(loader.communicate()[0]) for loader in loaders]
+    finally:
+        server.terminate()
+        server.wait()
+
+    throughput = sum(r["throughput_msgs_per_s"] for r in reports)
+    p99 = max(r["latency_ms"]["p99"] for r in reports)
+    errors = sum(r["errors"] + r["connect_errors"] for r in reports)
+    print(f"{processes:9} | {throughput:12.0f} | {p99:10.2f} | {errors:6}")
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--clients", type=int, default=max(2, cores // 2), help="load generator processes")
+    parser.add_argument("--connections", type=int, default=50, help="connections per load generator")
+    args = parser.parse_args()
+
+    print(f"{cores} cores, {args.clients} load generators x {args.connections} connections")
+    print("processes | msgs/s total | p99 ms max | errors")
+    counts = sorted({1, 2, 4, cores})
+    for i, processes in enumerate(counts):
+        run(processes, args.clients, args.connections, args.duration, 9300 + i)
@@ -0,0 +1,78 @@
+# Connection storm benchmark: thread per customer vs bounded handler pool
+#
+# Starts d2_server.py, then opens `storm` connections at the same moment.
+# Every customer reads the welcome, asks one question, reads the answer and
+# says exit. Prints latency percentiles, busy rejections and errors.
+#
+#   python bench_storm.py 2000
+
+import asyncio
+import subprocess
+import sys
+import time
+
+from bench_connections import HERE, server_stats
+from d2_server import BUSY_MSG, raise_fd_limit
+from framing import read_message_async, write_messages_async
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def customer(host, port):
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        welcome = await read_message_async(reader)
+        if welcome == BUSY_MSG:
+            return "busy", time.perf_counter() - start
+        write_messages_async(writer, ["Hi, I need help in order status"])
+        await writer.drain()
+        await read_message_async(reader)
+        latency = time.perf_counter() - start
+        write_messages_async(writer, ["exit"])
+        await writer.drain()
+        return "ok", latency
+    finally:
+        writer.close()
+
+
+async def storm(host, port, count):
+    results = await asyncio.gather(*[customer(host, port) for _ in range(count)], return_exceptions=True)
+    latencies = [r[1] for r in results if not isinstance(r, Exception) and r[0] == "ok"]
+    busy = sum(1 for r in results if not isinstance(r, Exception) and r[0] == "busy")
+    errors = sum(1 for r in results if isinstance(r, Exception))
+    return latencies, busy, errors
+
+
+def run(label, extra_args, count, port):
+    server = subprocess.Popen(
+        [sys.executable, "d2_server.py", "--port", str(port), "--backlog", "4096",
+         "--quiet"] + extra_args,
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)
+        start = time.perf_counter()
+        latencies, busy, errors = asyncio.run(storm("localhost", port, count))
+        elapsed = time.perf_counter() - start
+        stats = server_stats(server.pid)
+        print(f"{label:18} | {len(latencies):6} | {busy:6} | {errors:6} | {elapsed:6.2f} | "
+              f"{percentile(latencies, 50) * 1000:8.1f} | {percentile(latencies, 99) * 1000:8.1f} | "
+              f"{stats.get('VmRSS', '?'):>10}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"storm of {count} connections")
+    print("server             | served | busy   | errors | secs   | p50 ms   | p99 ms   | server RSS")
+    run("thread per client", ["--mode", "thread"], count, 9201)
+    run("pool 32 / q 256", ["--mode", "pool", "--workers", "32", "--queue-size", "256"], count, 9202)
+    run("pool 64 / q 4096", ["--mode", "pool", "--workers", "64", "--queue-size", "4096"], count, 9203)
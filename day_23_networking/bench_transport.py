@@ -0,0 +1,81 @@
+# TCP loopback vs Unix domain socket, same server, same protocol
+#
+# For each transport: start d2_server.py, measure the round trip time of
+# one customer sending messages one after the other (latency), then run
+# load_generator.py with many connections at full speed (throughput).
+#
+#   python bench_transport.py --mode asyncio --messages 20000 --duration 5
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench_connections import HERE
+from framing import FrameReader, send_message
+from load_generator import percentile
+from transport import connect
+
+SOCKET_PATH = f"/tmp/abc_bench_{os.getpid()}.sock"
+
+
+def round_trips(transport, port, messages):
+    client_socket = connect(transport, "localhost", port, SOCKET_PATH)
+    reader = FrameReader(client_socket)
+    reader.read_message()  # welcome
+    latencies = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        send_message(client_socket, "Hi, I need help in order status")
+        reader.read_message()
+        latencies.append(time.perf_counter() - start)
+    send_message(client_socket, "exit")
+    client_socket.close()
+    latencies.sort()
+    return latencies
+
+
+def run(transport, mode, port, messages, connections, duration):
+    server = subprocess.Popen(
+        [sys.executable, "d2_server.py", "--mode", mode, "--transport", transport,
+         "--port", str(port), "--socket-path", SOCKET_PATH,
+         "--quiet", "--idle-timeout", "0"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)
+        latencies = round_trips(transport, port, messages)
+        loader = subprocess.run(
+            [sys.executable, "load_generator.py", "--transport", transport, "--port", str(port),
+             "--socket-path", SOCKET_PATH, "--connections", str(connections),
+             "--rate", "0", "--duration", str(duration)],
+            cwd=HERE, stdout=subprocess.PIPE, text=True, check=True)
+        report = json.loads(loader.stdout)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{transport:9} | {percentile(latencies, 50) * 1e6:7.1f} | {percentile(latencies, 99) * 1e6:7.1f} | "
+          f"{messages / sum(latencies):9.0f} | {report['throughput_msgs_per_s']:12.0f} | "
+          f"{report['latency_ms']['p99']:7.2f}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["thread", "pool", "asyncio"], default="asyncio")
+    parser.add_argument("--messages", type=int, default=20000, help="round trips for the latency test")
+    parser.add_argument("--connections", type=int, default=50, help="load generator connections")
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.mode} server, 1 customer x {args.messages} round trips, "
+          f"then {args.connections} connections for {args.duration}s")
+    print("transport |  p50 us |  p99 us | 1 conn/s  | many conns/s | p99 ms")
+    try:
+        for i, transport in enumerate(("tcp", "unix")):
+            run(transport, args.mode, 9400 + i, args.messages, args.connections, args.duration)
+    finally:
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
@@ -1,6 +1,11 @@
 import socket 
 import platform
 
+from resolver import Resolver
+
+# shared by every lookup in this program, remembers answers for 5 minutes
+resolver = Resolver(ttl=300, negative_ttl=30)
+
 def explore_network_basics():
     print("========Networking========")
     
@@ -11,21 +16,15 @@ def explore_network_basics():
     # print(f"Local IP:",local_ip)
     print(f"Operating System: ", platform.system())    
     
-    # wait for exception to happen and catch
-    try:
-        # website info - https://www.flipkart.com/
-        flipkart_ip = socket.gethostbyname("flipkart.com")
-        print(f"Flipkart IP:",flipkart_ip)
-
-        # website info - IRCTC
-        irctc_ip = socket.gethostbyname("irctc.co.in")
-        print(f"IRCTC IP:",irctc_ip)
-
-        # website info - google
-        google_ip = socket.gethostbyname("google.com")
-        print(f"Google IP:",google_ip)
-    except Exception as e:
-        print(f"Error resolving domain: ",e)
-
-explore_network_basics()
+    # all websites are looked up at the same time (thread pool + cache)
+    # website info - https://www.flipkart.com/, IRCTC, google
+    websites = {"Flipkart": "flipkart.com", "IRCTC": "irctc.co.in", "Google": "google.com"}
+    results = resolver.resolve_many(websites.values())
+    for name, domain in websites.items():
+        if isinstance(results[domain], Exception):
+            print(f"Error resolving domain {domain}: ",results[domain])
+        else:
+            print(f"{name} IP:",results[domain][0])
 
+if __name__ == "__main__":
+    explore_network_basics()
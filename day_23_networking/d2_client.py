@@ -1,19 +1,22 @@
+import argparse
 import socket 
 import threading 
 import time 
 
-def create_client():
-    print("======== ABC Customer Service Client ========")
+from framing import FrameReader, send_message
+from transport import SOCKET_PATH, TRANSPORTS, connect
 
-    # create server socket
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+def create_client(transport="tcp", socket_path=SOCKET_PATH):
+    print("======== ABC Customer Service Client ========")
 
+    client_socket = None
     try:
-        # connet to server - localhost:8888
-        client_socket.connect(('localhost',8888))
+        # connet to server - localhost:8888 (or the Unix socket file)
+        client_socket = connect(transport, 'localhost', 8888, socket_path)
         
         # Receive welcome message from server
-        welcome = client_socket.recv(1024).decode('utf-8')
+        reader = FrameReader(client_socket)
+        welcome = reader.read_message()
         print(f"Server says: {welcome}")
         
         # Simulate customer message
@@ -29,18 +32,24 @@ def create_client():
         
         for message in messages:
             print(f"From client: {message}")
-            client_socket.send(message.encode('utf-8'))
+            send_message(client_socket, message)
             
             if message.lower()=="exit":
                 break
             
-            res = client_socket.recv(1024).decode('utf-8')
+            res = reader.read_message()
             print(f"From server: {res}")
             time.sleep(4)
             
     except Exception as e:
         print(f"Client error: {e}")
     finally:
-        client_socket.close()
+        if client_socket is not None:
+            client_socket.close()
 
-create_client()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ABC Customer Service Client")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="tcp")
+    parser.add_argument("--socket-path", default=SOCKET_PATH)
+    args = parser.parse_args()
+    create_client(args.transport, args.socket_path)
@@ -1,71 +1,579 @@
-import socket 
-import threading 
-import time 
+import argparse
+import asyncio
+import itertools
+import os
+import resource
+import signal
+import socket
+import sys
+import threading
+import time
 
-def create_server():
+from framing import FrameReader, read_message_async, send_message, write_messages_async
+from handler_pool import HandlerPool
+from intent_matcher import IntentMatcher
+from metrics import registry, start_stats_server
+from outbound import OutboundQueue
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from timer_wheel import IdleReaper
+from transport import (SOCKET_PATH, TRANSPORTS, close_listener, describe, listen, peer_key,
+                       peer_name, remove_socket_file)
+
+# Server Config
+HOST = "localhost"
+PORT = 8888
+
+WELCOME_MSG = "Welcome to ABC Customer Service! How can I help you?\n"
+BUSY_MSG = "Server is busy, please try again later.\n"
+SLOW_DOWN_MSG = "Too many messages, please slow down.\n"
+IDLE_MSG = "No message for a long time, closing the chat. Goodbye!\n"
+
+# seconds without a message before an idle customer is disconnected, and
+# seconds a started message may take to arrive completely (0 = no limit)
+IDLE_TIMEOUT = 300.0
+READ_TIMEOUT = 30.0
+# stop reading from a customer while this many reply bytes wait to be sent
+OUTBOUND_HIGH_WATER = 64 * 1024
+# unique number per connection (message limiter key); next() is atomic
+CONNECTION_IDS = itertools.count()
+reaper = None
+reaper_lock = threading.Lock()
+
+# intent -> response table, reloaded automatically when the file changes
+INTENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json")
+intents = IntentMatcher.from_file(INTENTS_FILE) if os.path.exists(INTENTS_FILE) else IntentMatcher()
+
+# answers for repeated messages (the default reply echoes the message,
+# so only the matched intent response is cached)
+reply_cache = ResponseCache(max_size=10000, ttl=300)
+cached_automaton = None
+
+# live metrics, served in Prometheus text format with --stats-port
+CONNECTIONS = registry.counter("abc_connections_total",
+                               "Customer connections (not counted: peers that left without a message)")
+ACTIVE = registry.gauge("abc_connections_active", "Customers connected right now")
+REJECTED = registry.counter("abc_connections_rejected_total", "Connections turned away (busy / rate limit)")
+MESSAGES = registry.counter("abc_messages_total", "Customer messages handled")
+SEND_CALLS = registry.counter("abc_send_calls_total", "sendmsg calls for replies (thread/pool modes)")
+IDLE_DISCONNECTS = registry.counter("abc_idle_disconnects_total", "Customers disconnected for being idle")
+LATENCY = registry.histogram("abc_message_latency_seconds", "Time to build and send one reply")
+registry.gauge("abc_reply_cache_hits", "Reply cache hits", fn=lambda: reply_cache.hits)
+registry.gauge("abc_reply_cache_misses", "Reply cache misses", fn=lambda: reply_cache.misses)
+registry.gauge("abc_reply_cache_size", "Messages in the reply cache", fn=lambda: len(reply_cache.entries))
+
+# print every message? (turn off for load tests)
+VERBOSE = True
+
+def log(message):
+    if VERBOSE:
+        print(message)
+
+def is_exit(data):
+    return not data or data.lower()=='bye' or data.lower()=='exit'
+
+def build_reply(data):
+    # same replies for every server mode
+    global cached_automaton
+    # cache hits never reach intents.lookup() -> check for a new table here
+    intents.maybe_reload()
+    automaton = intents.automaton
+    if automaton is not cached_automaton:
+        # intent table was (re)loaded -> old answers may be wrong
+        cached_automaton = automaton
+        reply_cache.clear()
+    # entries remember the automaton they came from: an answer computed
+    # just before a reload is not used after it
+    entry = reply_cache.get(data)
+    if entry is None or entry[0] is not automaton:
+        index = automaton.match(data.lower())
+        entry = (automaton, automaton.table[index]["response"] if index >= 0 else None)
+        reply_cache.put(data, entry)
+    response = entry[1]
+    return response if response is not None else intents.default_reply(data)
+
+def get_reaper():
+    # one timer wheel per process (prefork workers start their own after fork)
+    global reaper
+    with reaper_lock:
+        if reaper is None or reaper.pid != os.getpid():
+            reaper = IdleReaper(tick=0.1)
+            registry.gauge("abc_idle_timers", "Connections with an idle timer",
+                           fn=lambda: reaper.pending())
+        return reaper
+
+def watch_idle(address, on_expire):
+    # timer for one connection, None when idle timeouts are off
+    if not IDLE_TIMEOUT:
+        return None
+    return get_reaper().watch(address, IDLE_TIMEOUT, on_expire)
+
+def touch_idle(timer):
+    if timer is not None:
+        reaper.touch(timer, IDLE_TIMEOUT)
+
+def read_started(timer):
+    # first bytes of a message arrived -> the rest must follow within READ_TIMEOUT
+    if timer is None or not READ_TIMEOUT:
+        return None
+    return lambda: reaper.touch(timer, READ_TIMEOUT)
+
+def forget_idle(timer):
+    if timer is not None:
+        reaper.forget(timer)
+
+def raise_fd_limit():
+    # every connection is a file descriptor -> allow as many as the OS lets us
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+def create_server(mode="thread", host=HOST, port=PORT, backlog=128,
+                  connection_limiter=None, message_limiter=None,
+                  workers=32, queue_size=256, stats_interval=0,
+                  processes=None, grace=10.0, transport="tcp", socket_path=SOCKET_PATH,
+                  stats_port=0):
     print("======== ABC Customer Service Server ========")
 
-    # create server socket
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    
-    # Server Config
-    HOST = "localhost"
-    PORT = 8888
-    
+    where = dict(transport=transport, socket_path=socket_path)
+    if stats_port and mode != "prefork":
+        start_stats_server(stats_port, host)
+        print(f"Metrics at http://{host}:{stats_port}/metrics")
+    if mode == "thread":
+        serve_threads(host, port, backlog, connection_limiter, message_limiter, **where)
+    elif mode == "pool":
+        serve_pool(host, port, backlog, workers, queue_size, stats_interval,
+                   connection_limiter, message_limiter, **where)
+    elif mode == "asyncio":
+        asyncio.run(serve_asyncio(host, port, backlog, connection_limiter, message_limiter, **where))
+    elif mode == "prefork":
+        if transport != "tcp":
+            # SO_REUSEPORT spreads TCP connections only
+            raise ValueError("prefork mode only works with the tcp transport")
+        serve_prefork(host, port, backlog, processes or os.cpu_count() or 1, grace,
+                      connection_limiter, message_limiter, stats_port)
+    else:
+        raise ValueError(f"Unknown server mode: {mode}")
+
+def serve_threads(host, port, backlog, connection_limiter=None, message_limiter=None,
+                  transport="tcp", socket_path=SOCKET_PATH):
+    # create server socket (TCP host:port or a Unix socket file)
+    server_socket = listen(transport, host, port, socket_path, backlog)
+
     try:
-        # bind socket to my config
-        server_socket.bind((HOST, PORT))
-        # can handle 2 connection
-        server_socket.listen(2)
-        
-        print(f"Server is up and running at {HOST}:{PORT}")
+        print(f"Server is up and running at {describe(transport, host, port, socket_path)} "
+              f"(thread per customer)")
         print(f"Waiting for customer connections...")
-        
+
         while True:
             # accept client connection
             client_socket, client_address = server_socket.accept()
-            print(f"Customer connected from {client_address}")
-            
+            client_address = peer_name(client_address, client_socket)
+            log(f"Customer connected from {client_address}")
+
+            # shed load early instead of starting one more thread
+            if connection_limiter is not None and not connection_limiter.allow(peer_key(client_address)):
+                send_message(client_socket, BUSY_MSG)
+                client_socket.close()
+                REJECTED.inc()
+                log(f"Rejected {client_address}: too many connections")
+                continue
+
             # Handle in client in thread
             client_thread = threading.Thread(
-                target=handle_customer, 
-                args=(client_socket, client_address)
+                target=handle_customer_thread,
+                args=(client_socket, client_address, message_limiter),
+                daemon=True
             )
             client_thread.start()
     except Exception as e:
         print(f"Error: {e}")
     finally:
         # clean resource
-        server_socket.close()
-    
-def handle_customer(client_socket, address):
+        close_listener(server_socket, transport, socket_path)
+
+# ---------- pool mode: fixed handler threads + bounded queue ----------
+
+def reject_busy(client_socket, address):
+    try:
+        send_message(client_socket, BUSY_MSG)
+    except OSError:
+        pass
+    client_socket.close()
+    REJECTED.inc()
+    log(f"Rejected {address}: server busy")
+
+def report_pool(pool, interval):
+    while True:
+        time.sleep(interval)
+        m = pool.metrics()
+        print(f"[pool] busy {m['busy']}/{m['workers']} ({m['utilization']:.0%}), "
+              f"queue {m['queue_depth']} (max {m['max_queue_depth']}), "
+              f"accepted {m['accepted']}, rejected {m['rejected']}, handled {m['handled']}")
+
+def serve_pool(host, port, backlog, workers, queue_size, stats_interval=0,
+               connection_limiter=None, message_limiter=None,
+               transport="tcp", socket_path=SOCKET_PATH):
+    server_socket = listen(transport, host, port, socket_path, backlog)
+    pool = HandlerPool(
+        lambda client_socket, address: handle_customer(client_socket, address, message_limiter),
+        workers=workers, queue_size=queue_size, on_reject=reject_busy)
+    registry.gauge("abc_pool_busy_handlers", "Pool handlers serving a customer", fn=lambda: pool.busy)
+    registry.gauge("abc_pool_queue_depth", "Connections waiting for a handler", fn=pool.pending.qsize)
+    if stats_interval:
+        threading.Thread(target=report_pool, args=(pool, stats_interval), daemon=True).start()
+
+    try:
+        print(f"Server is up and running at {describe(transport, host, port, socket_path)} "
+              f"({workers} handlers, queue of {queue_size})")
+        print(f"Waiting for customer connections...")
+
+        while True:
+            client_socket, client_address = server_socket.accept()
+            client_address = peer_name(client_address, client_socket)
+            log(f"Customer connected from {client_address}")
+
+            if connection_limiter is not None and not connection_limiter.allow(peer_key(client_address)):
+                reject_busy(client_socket, client_address)
+                continue
+
+            # full queue -> busy reply, no new thread
+            pool.submit(client_socket, client_address)
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        close_listener(server_socket, transport, socket_path)
+        pool.shutdown()
+
+def heard_from(heard):
+    # a peer that closes before its first message (the Unix socket liveness
+    # probe of a second server, a port scanner) is no customer: it is not
+    # counted and its broken pipe is not reported
+    if not heard:
+        heard.append(True)
+        CONNECTIONS.inc()
+
+def handle_customer(client_socket, address, limiter=None):
+    # the message limiter counts per connection: a fresh key every time,
+    # id() of a closed socket is reused by the next one
+    limiter_key = next(CONNECTION_IDS)
+    ACTIVE.inc()
+    timed_out = []
+    heard = []  # set at the first message
+    out = OutboundQueue(client_socket, high_water=OUTBOUND_HIGH_WATER)
+
+    def on_idle():
+        # runs in the reaper thread: wake up the blocked recv() with EOF,
+        # or the blocked send of a customer who stopped reading
+        timed_out.append(True)
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR if out.sending else socket.SHUT_RD)
+        except OSError:
+            pass
+
+    timer = watch_idle(address, on_idle)
     try:
         # send welcome message
-        welcome_msg = "Welcome to ABC Customer Service! How can I help you?\n"
-        client_socket.send(welcome_msg.encode('utf-8'))
-        
+        out.push(WELCOME_MSG)
+        out.flush()
+        reader = FrameReader(client_socket, on_partial=read_started(timer))
+
         while True:
-            # Receive message from client
-            data = client_socket.recv(1024).decode('utf-8')
-            if(not data or data.lower()=='bye' or  data.lower()=='exit'):
+            # Receive message from client (one frame = one message)
+            data = reader.read_message()
+            if data is not None:
+                heard_from(heard)
+            if timed_out or is_exit(data):
                 break
-            print(f"Customer form {address}: {data}")
-            
-            if 'order' in data.lower():
-                res = "I will check your order. Please wait.... \n"
-            elif 'refund' in data.lower():
-                res = "I will process refund immediately....\n"
-            elif 'help' in data.lower():
-                res = "Available services: Order status, refund, product info"
+            touch_idle(timer)
+            log(f"Customer form {address}: {data}")
+
+            start = time.perf_counter()
+            if limiter is not None and not limiter.allow(limiter_key):
+                out.push(SLOW_DOWN_MSG)
             else:
-                res = f"Thank you for message: {data}. Our team will connect soon. \n"
-            client_socket.send(res.encode('utf-8'))
+                out.push(build_reply(data))
+            # more messages already received? answer them all with one
+            # sendmsg, unless the queue is above the high-water mark
+            # (then we stop reading until the customer took the replies)
+            if out.full() or not reader.has_frame():
+                out.flush()
+            MESSAGES.inc()
+            LATENCY.observe(time.perf_counter() - start)
+        out.flush()
     except Exception as e:
-        print(f"Error handling customer {address}: {e}")
+        if heard and not timed_out:
+            print(f"Error handling customer {address}: {e}")
     finally:
+        if timed_out:
+            heard_from(heard)
+        SEND_CALLS.inc(out.send_calls)
+        forget_idle(timer)
+        if limiter is not None:
+            limiter.forget(limiter_key)
+        if timed_out:
+            say_goodbye(client_socket, address)
+        ACTIVE.dec()
         client_socket.close()
-        print(f"customer {address} disconnected")
+        log(f"customer {address} disconnected")
+
+def handle_customer_thread(client_socket, address, limiter=None):
+    # thread mode: the thread ends with the customer -> drop its metric shards
+    try:
+        handle_customer(client_socket, address, limiter)
+    finally:
+        registry.release_thread()
+
+def say_goodbye(client_socket, address):
+    # only the receiving side was shut down, we can still send
+    IDLE_DISCONNECTS.inc()
+    log(f"Customer {address} was idle too long")
+    try:
+        send_message(client_socket, IDLE_MSG)
+    except OSError:
+        pass
+
+# ---------- asyncio mode: one thread, one coroutine per customer ----------
+
+async def serve_asyncio(host, port, backlog, connection_limiter=None, message_limiter=None,
+                        reuse_port=False, grace=None, transport="tcp", socket_path=SOCKET_PATH):
+    async def on_connect(reader, writer):
+        address = peer_name(writer.get_extra_info('peername'), writer.get_extra_info('socket'))
+        log(f"Customer connected from {address}")
+        if connection_limiter is not None and not connection_limiter.allow(peer_key(address)):
+            write_messages_async(writer, [BUSY_MSG])
+            writer.close()
+            REJECTED.inc()
+            log(f"Rejected {address}: too many connections")
+            return
+        await handle_customer_async(reader, writer, address, message_limiter)
+
+    if transport == "unix":
+        server = await asyncio.start_unix_server(on_connect, sock=listen(transport, host, port,
+                                                                         socket_path, backlog))
+    else:
+        server = await asyncio.start_server(on_connect, host, port, backlog=backlog,
+                                            reuse_address=True, reuse_port=reuse_port)
+    print(f"Server is up and running at {describe(transport, host, port, socket_path)} "
+          f"(asyncio, pid {os.getpid()})")
+    print(f"Waiting for customer connections...")
+
+    if grace is None:
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            remove_socket_file(transport, socket_path)
+        return
+
+    # graceful mode (prefork workers): SIGTERM -> stop accepting,
+    # let connected customers finish for up to `grace` seconds
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await stop.wait()
+    server.close()
+    deadline = time.monotonic() + grace
+    while ACTIVE.value() > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    print(f"Worker {os.getpid()} stopped ({ACTIVE.value()} customers cut off)")
+
+async def handle_customer_async(reader, writer, address, limiter=None):
+    limiter_key = next(CONNECTION_IDS)
+    ACTIVE.inc()
+    loop = asyncio.get_running_loop()
+    timed_out = []
+    heard = []
+
+    def expire():
+        timed_out.append(True)
+        reader.feed_eof()
+        if writer.transport.get_write_buffer_size() >= OUTBOUND_HIGH_WATER:
+            writer.transport.abort()  # stuck in drain(): customer stopped reading
+
+    # reaper thread -> event loop thread
+    timer = watch_idle(address, lambda: loop.call_soon_threadsafe(expire))
+    # the transport has its own outbound buffer: drain() waits (and we stop
+    # reading) while more than OUTBOUND_HIGH_WATER bytes are queued
+    writer.transport.set_write_buffer_limits(high=OUTBOUND_HIGH_WATER)
+    try:
+        write_messages_async(writer, [WELCOME_MSG])
+        await writer.drain()
+
+        while True:
+            data = await read_message_async(reader, on_partial=read_started(timer))
+            if data is not None:
+                heard_from(heard)
+            if timed_out or is_exit(data):
+                break
+            touch_idle(timer)
+            log(f"Customer form {address}: {data}")
+
+            start = time.perf_counter()
+            if limiter is not None and not limiter.allow(limiter_key):
+                write_messages_async(writer, [SLOW_DOWN_MSG])
+            else:
+                write_messages_async(writer, [build_reply(data)])
+            await writer.drain()
+            MESSAGES.inc()
+            LATENCY.observe(time.perf_counter() - start)
+    except Exception as e:
+        if heard and not timed_out:
+            print(f"Error handling customer {address}: {e}")
+    finally:
+        if timed_out:
+            heard_from(heard)
+        forget_idle(timer)
+        if limiter is not None:
+            limiter.forget(limiter_key)
+        if timed_out:
+            IDLE_DISCONNECTS.inc()
+            log(f"Customer {address} was idle too long")
+            write_messages_async(writer, [IDLE_MSG])
+        ACTIVE.dec()
+        writer.close()
+        log(f"customer {address} disconnected")
+
+# ---------- prefork mode: N processes, each with its own event loop ----------
+
+def start_worker_stats(host, port):
+    # metrics live in each worker process, so worker i serves its own on
+    # stats_port + i. During a rolling restart the old worker of this slot
+    # still holds the port until it exits -> keep trying in the background.
+    def bind():
+        while True:
+            try:
+                start_stats_server(port, host)
+                print(f"Worker {os.getpid()} metrics at http://{host}:{port}/metrics")
+                return
+            except OSError:
+                time.sleep(0.5)
+    threading.Thread(target=bind, daemon=True, name="stats-bind").start()
+
+def _spawn_worker(slot, host, port, backlog, grace, connection_limiter, message_limiter, stats_port):
+    pid = os.fork()
+    if pid:
+        return pid
+    # child: every worker binds the same port, the kernel spreads connections
+    code = 0
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # parent decides when we stop
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if stats_port:
+            start_worker_stats(host, stats_port + slot)
+        asyncio.run(serve_asyncio(host, port, backlog, connection_limiter, message_limiter,
+                                  reuse_port=True, grace=grace))
+    except BaseException as e:
+        print(f"Worker {os.getpid()} failed: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        os._exit(code)
+
+def serve_prefork(host, port, backlog, processes, grace=10.0,
+                  connection_limiter=None, message_limiter=None, stats_port=0):
+    # SIGHUP -> restart the workers one by one (no downtime)
+    # SIGTERM / Ctrl+C -> stop everything
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("prefork mode needs SO_REUSEPORT (Linux / BSD)")
+
+    args = (host, port, backlog, grace, connection_limiter, message_limiter, stats_port)
+    requests = {"restart": False, "stop": False}
+    signal.signal(signal.SIGHUP, lambda *_: requests.update(restart=True))
+    signal.signal(signal.SIGTERM, lambda *_: requests.update(stop=True))
+    signal.signal(signal.SIGINT, lambda *_: requests.update(stop=True))
+
+    workers = [_spawn_worker(slot, *args) for slot in range(processes)]
+    print(f"Started {processes} worker processes: {workers}")
+
+    def wait_for(pid):
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+    while True:
+        time.sleep(0.2)
+        if requests["stop"]:
+            break
+
+        # replace workers that died on their own
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in workers:
+                print(f"Worker {pid} exited unexpectedly, starting a new one")
+                slot = workers.index(pid)
+                workers[slot] = _spawn_worker(slot, *args)
+
+        if requests["restart"]:
+            requests["restart"] = False
+            print("Graceful restart of all workers...")
+            for i, old in enumerate(list(workers)):
+                # new worker is listening before the old one stops accepting
+                workers[i] = _spawn_worker(i, *args)
+                time.sleep(0.2)
+                os.kill(old, signal.SIGTERM)
+                wait_for(old)
+            print(f"Workers now: {workers}")
+
+    print("Stopping workers...")
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in workers:
+        wait_for(pid)
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ABC Customer Service Server")
+    parser.add_argument("--mode", choices=["thread", "pool", "asyncio", "prefork"], default="thread")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--transport", choices=TRANSPORTS, default="tcp",
+                        help="unix = Unix domain socket for clients on this machine")
+    parser.add_argument("--socket-path", default=SOCKET_PATH, help="socket file (unix transport)")
+    parser.add_argument("--backlog", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=32, help="handler threads (pool mode)")
+    parser.add_argument("--queue-size", type=int, default=256, help="waiting connections (pool mode)")
+    parser.add_argument("--stats-interval", type=float, default=0, help="print pool metrics every N seconds")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (prefork mode)")
+    parser.add_argument("--grace", type=float, default=10.0, help="seconds a stopping worker waits for customers")
+    parser.add_argument("--intents", default=INTENTS_FILE, help="intent table JSON file")
+    parser.add_argument("--stats-port", type=int, default=0,
+                        help="serve Prometheus metrics on this port (prefork: worker i on port + i)")
+    parser.add_argument("--quiet", action="store_true", help="do not print every message")
+    parser.add_argument("--limits", action="store_true",
+                        help="rate limit new connections per IP and messages per connection")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="disconnect customers silent for N seconds (0 = never)")
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT,
+                        help="seconds to finish a started message (0 = no limit)")
+    args = parser.parse_args()
 
-create_server()
\ No newline at end of file
+    VERBOSE = not args.quiet
+    IDLE_TIMEOUT = args.idle_timeout
+    READ_TIMEOUT = args.read_timeout
+    if args.intents != INTENTS_FILE:
+        intents = IntentMatcher.from_file(args.intents)
+    print(f"Open files limit: {raise_fd_limit()}")
+    limits = {}
+    if args.limits:
+        # 20 new connections/s per IP (burst 50), 10 messages/s per connection (burst 20)
+        limits = dict(
+            connection_limiter=RateLimiter(rate=20, burst=50),
+            message_limiter=RateLimiter(rate=10, burst=20),
+        )
+    create_server(args.mode, args.host, args.port, args.backlog,
+                  workers=args.workers, queue_size=args.queue_size,
+                  stats_interval=args.stats_interval,
+                  processes=args.processes, grace=args.grace,
+                  transport=args.transport, socket_path=args.socket_path,
+                  stats_port=args.stats_port, **limits)
@@ -0,0 +1,194 @@
+# Length prefixed framing for the customer service chat protocol
+#
+# TCP is a byte stream: one send() is not one recv(). Under load two
+# messages can arrive in one recv() or one message can be split over two.
+# So every message is sent as
+#
+#   [4 byte big endian length][utf-8 text]
+#
+# FrameReader receives into one preallocated bytearray with recv_into()
+# (no new bytes object per recv) and cuts complete frames out of it.
+# send_frames() packs many frames into one buffer and sends it with a
+# single sendall().
+
+import asyncio
+import socket
+import struct
+import threading
+import time
+
+HEADER = struct.Struct("!I")
+MAX_FRAME = 1024 * 1024  # refuse absurd lengths from broken clients
+
+
+class FrameError(Exception):
+    pass
+
+
+def encode_frame(message):
+    payload = message.encode('utf-8')
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frames(sock, messages):
+    # all frames in one buffer -> one syscall
+    out = bytearray()
+    for message in messages:
+        payload = message.encode('utf-8')
+        out += HEADER.pack(len(payload))
+        out += payload
+    sock.sendall(out)
+
+
+def send_message(sock, message):
+    send_frames(sock, (message,))
+
+
+class FrameReader:
+    def __init__(self, sock, buffer_size=4096, max_frame=MAX_FRAME, on_partial=None):
+        self.sock = sock
+        # called when a message has started but is not complete yet
+        # (the server switches from idle timeout to read timeout)
+        self.on_partial = on_partial
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0  # first unread byte
+        self.end = 0    # end of received data
+        self.max_frame = max_frame
+
+    def _frame(self):
+        # complete frame in the buffer? -> str, else None
+        available = self.end - self.start
+        if available < HEADER.size:
+            return None
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        if length > self.max_frame:
+            raise FrameError(f"Frame of {length} bytes is too large")
+        if available < HEADER.size + length:
+            self._make_room(HEADER.size + length)
+            return None
+        begin = self.start + HEADER.size
+        message = str(self.view[begin:begin + length], 'utf-8')
+        self.start = begin + length
+        if self.start == self.end:
+            self.start = self.end = 0
+        return message
+
+    def has_frame(self):
+        # is a complete message already received? (read_message won't block)
+        available = self.end - self.start
+        if available < HEADER.size:
+            return False
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        return available >= HEADER.size + length
+
+    def _make_room(self, frame_size):
+        if frame_size > len(self.buffer):
+            # grow once for a big frame
+            bigger = bytearray(max(frame_size, len(self.buffer) * 2))
+            bigger[:self.end - self.start] = self.view[self.start:self.end]
+            self.view.release()
+            self.buffer = bigger
+            self.view = memoryview(self.buffer)
+            self.end -= self.start
+            self.start = 0
+        elif self.start + frame_size > len(self.buffer):
+            # move the partial frame to the front
+            count = self.end - self.start
+            self.buffer[:count] = self.view[self.start:self.end]
+            self.start, self.end = 0, count
+
+    def read_message(self):
+        # next message, or None when the other side closed the connection
+        reported = False
+        while True:
+            message = self._frame()
+            if message is not None:
+                return message
+            if self.end != self.start and not reported and self.on_partial is not None:
+                self.on_partial()
+                reported = True
+            if self.end == len(self.buffer):
+                self._make_room(len(self.buffer) - self.start + 1)
+            received = self.sock.recv_into(self.view[self.end:])
+            if received == 0:
+                if self.end != self.start:
+                    raise FrameError("Connection closed in the middle of a message")
+                return None
+            self.end += received
+
+
+# ---------- asyncio helpers ----------
+
+async def read_message_async(reader, on_partial=None):
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise FrameError("Connection closed in the middle of a message")
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise FrameError(f"Frame of {length} bytes is too large")
+    if on_partial is not None and length:
+        on_partial()
+    return (await reader.readexactly(length)).decode('utf-8')
+
+
+def write_messages_async(writer, messages):
+    # caller still has to `await writer.drain()`
+    out = bytearray()
+    for message in messages:
+        payload = message.encode('utf-8')
+        out += HEADER.pack(len(payload))
+        out += payload
+    writer.write(out)
+
+
+def benchmark(messages=200000, batch=64):
+    text = "Hi, I need help in order status"
+
+    def sender(sock):
+        for first in range(0, messages, batch):
+            send_frames(sock, [text] * min(batch, messages - first))
+        sock.shutdown(socket.SHUT_WR)
+
+    # framed receive with recv_into + memoryview
+    left, right = socket.socketpair()
+    thread = threading.Thread(target=sender, args=(left,))
+    start = time.perf_counter()
+    thread.start()
+    reader = FrameReader(right)
+    received = 0
+    while reader.read_message() is not None:
+        received += 1
+    elapsed = time.perf_counter() - start
+    thread.join()
+    left.close()
+    right.close()
+    print(f"framed recv_into : {received / elapsed:10.0f} msgs/s ({received} received)")
+
+    # one send per message + recv(1024) per "message", like the old code
+    left, right = socket.socketpair()
+
+    def old_sender(sock):
+        for _ in range(messages):
+            sock.send(text.encode('utf-8'))
+        sock.shutdown(socket.SHUT_WR)
+
+    thread = threading.Thread(target=old_sender, args=(left,))
+    start = time.perf_counter()
+    thread.start()
+    recvs = 0
+    while right.recv(1024).decode('utf-8'):
+        recvs += 1
+    elapsed = time.perf_counter() - start
+    thread.join()
+    left.close()
+    right.close()
+    print(f"send + recv(1024): {messages / elapsed:10.0f} msgs/s "
+          f"(only {recvs} recv calls for {messages} messages -> messages got merged)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,92 @@
+# Fixed size pool of customer handlers with a bounded waiting queue
+#
+# create_server() in thread mode starts one new thread per accept(), with
+# no limit. In a connection storm that means thousands of threads. Here a
+# fixed number of handler threads take accepted connections from a bounded
+# queue. When the queue is full the connection is turned away right away
+# with a busy message instead of waiting (backpressure).
+
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class HandlerPool:
+    def __init__(self, handler, workers=32, queue_size=256, on_reject=None):
+        self.handler = handler      # handler(client_socket, address)
+        self.on_reject = on_reject  # on_reject(client_socket, address)
+        self.workers = workers
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.handled = 0
+        self.max_depth = 0
+        self.busy_time = 0.0
+        self.started = time.monotonic()
+        self.threads = [threading.Thread(target=self._work, daemon=True, name=f"handler-{i}")
+                        for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, client_socket, address):
+        # True if queued, False if the connection was rejected
+        try:
+            self.pending.put_nowait((client_socket, address))
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            if self.on_reject is not None:
+                self.on_reject(client_socket, address)
+            else:
+                client_socket.close()
+            return False
+        with self.lock:
+            self.accepted += 1
+            depth = self.pending.qsize()
+            if depth > self.max_depth:
+                self.max_depth = depth
+        return True
+
+    def _work(self):
+        while True:
+            item = self.pending.get()
+            if item is _STOP:
+                return
+            client_socket, address = item
+            with self.lock:
+                self.busy += 1
+            start = time.monotonic()
+            try:
+                self.handler(client_socket, address)
+            except Exception as e:
+                print(f"Error handling customer {address}: {e}")
+            finally:
+                with self.lock:
+                    self.busy -= 1
+                    self.handled += 1
+                    self.busy_time += time.monotonic() - start
+
+    def metrics(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "workers": self.workers,
+                "busy": self.busy,
+                "utilization": self.busy / self.workers,
+                "avg_utilization": self.busy_time / (elapsed * self.workers) if elapsed else 0.0,
+                "queue_depth": self.pending.qsize(),
+                "max_queue_depth": self.max_depth,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "handled": self.handled,
+            }
+
+    def shutdown(self):
+        for _ in self.threads:
+            self.pending.put(_STOP)
+        for thread in self.threads:
+            thread.join()
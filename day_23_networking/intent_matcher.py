@@ -0,0 +1,201 @@
+# Multi keyword intent matcher (Aho-Corasick) for customer replies
+#
+# handle_customer used to check 'order' in ..., 'refund' in ..., one keyword
+# at a time. With thousands of keywords that is thousands of scans per
+# message. Aho-Corasick compiles all keywords into one automaton and finds
+# every keyword in a single pass over the message.
+#
+# Intent table (JSON):
+#   [{"intent": "order", "priority": 30, "keywords": ["order", "delivery"],
+#     "response": "I will check your order. Please wait.... \n"}, ...]
+#
+# When several intents match, the highest priority wins (ties: first in the
+# table). The table file is re-read when it changes on disk (hot reload).
+
+import collections
+import json
+import os
+import random
+import string
+import threading
+import time
+
+DEFAULT_TABLE = [
+    {"intent": "order", "priority": 30, "keywords": ["order"],
+     "response": "I will check your order. Please wait.... \n"},
+    {"intent": "refund", "priority": 20, "keywords": ["refund"],
+     "response": "I will process refund immediately....\n"},
+    {"intent": "help", "priority": 10, "keywords": ["help"],
+     "response": "Available services: Order status, refund, product info"},
+]
+DEFAULT_RESPONSE = "Thank you for message: {message}. Our team will connect soon. \n"
+
+
+class Automaton:
+    def __init__(self, table):
+        self.table = table
+        self.goto = [{}]   # node -> {char: node}
+        self.best = [-1]   # node -> index of best intent ending here (incl. fail links)
+        for index, entry in enumerate(table):
+            for keyword in entry["keywords"]:
+                self._add(keyword.lower(), index)
+        self._link()
+
+    def _better(self, a, b):
+        # is intent a better than intent b?
+        if b < 0:
+            return a >= 0
+        if a < 0:
+            return False
+        pa, pb = self.table[a]["priority"], self.table[b]["priority"]
+        return pa > pb or (pa == pb and a < b)
+
+    def _add(self, keyword, index):
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.best.append(-1)
+            node = nxt
+        if self._better(index, self.best[node]):
+            self.best[node] = index
+
+    def _link(self):
+        # breadth first: fail link = longest proper suffix that is also a prefix
+        self.fail = [0] * len(self.goto)
+        pending = collections.deque()
+        for node in self.goto[0].values():
+            pending.append(node)
+        while pending:
+            node = pending.popleft()
+            for ch, child in self.goto[node].items():
+                pending.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                if self._better(self.best[self.fail[child]], self.best[child]):
+                    self.best[child] = self.best[self.fail[child]]
+
+    def match(self, text):
+        # index of the winning intent or -1, one pass over the text
+        goto, fail, best_at = self.goto, self.fail, self.best
+        node = 0
+        best = -1
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found = best_at[node]
+            if found >= 0 and (best < 0 or self._better(found, best)):
+                best = found
+        return best
+
+
+class IntentMatcher:
+    def __init__(self, table=None, default_response=DEFAULT_RESPONSE, path=None, check_interval=2.0):
+        self.default_response = default_response
+        self.path = path
+        self.check_interval = check_interval
+        self.mtime = None
+        self.next_check = 0.0
+        self.lock = threading.Lock()  # only one thread reloads at a time
+        self.automaton = Automaton(table if table is not None else DEFAULT_TABLE)
+        if path:
+            self.reload()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(path=path, **kwargs)
+
+    def reload(self):
+        # build the new automaton first, then swap it in with one assignment
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding="utf-8") as file:
+            table = json.load(file)
+        self.automaton = Automaton(table)
+        self.mtime = mtime
+
+    def maybe_reload(self):
+        # re-read the table if the file changed (checked every check_interval s)
+        now = time.monotonic()
+        if not self.path or now < self.next_check or not self.lock.acquire(False):
+            return
+        try:
+            self.next_check = now + self.check_interval
+            try:
+                if os.stat(self.path).st_mtime != self.mtime:
+                    self.reload()
+                    print(f"Intent table reloaded from {self.path}")
+            except (OSError, ValueError) as e:
+                print(f"Keeping old intent table, reload failed: {e}")
+        finally:
+            self.lock.release()
+
+    def intent(self, message):
+        self.maybe_reload()
+        automaton = self.automaton
+        index = automaton.match(message.lower())
+        return automaton.table[index]["intent"] if index >= 0 else None
+
+    def lookup(self, message):
+        # response of the matching intent, or None (-> default response)
+        self.maybe_reload()
+        automaton = self.automaton
+        index = automaton.match(message.lower())
+        return automaton.table[index]["response"] if index >= 0 else None
+
+    def default_reply(self, message):
+        return self.default_response.format(message=message)
+
+    def reply(self, message):
+        response = self.lookup(message)
+        return response if response is not None else self.default_reply(message)
+
+
+def benchmark(keywords=10000, messages=2000, seed=5):
+    rng = random.Random(seed)
+    words = {"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+             for _ in range(keywords)}
+    words = sorted(words)
+    table = [{"intent": f"intent-{i}", "priority": rng.randint(1, 100), "keywords": words[i:i + 10],
+              "response": f"reply {i}\n"} for i in range(0, len(words), 10)]
+    texts = [" ".join(rng.choice(words) if rng.random() < 0.2 else "hello" for _ in range(12))
+             for _ in range(messages)]
+
+    start = time.perf_counter()
+    matcher = IntentMatcher(table)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        matcher.reply(text)
+    ac_time = time.perf_counter() - start
+
+    # old style: one `in` check per keyword, in priority order
+    ordered = sorted(table, key=lambda entry: -entry["priority"])
+    start = time.perf_counter()
+    for text in texts:
+        lowered = text.lower()
+        for entry in ordered:
+            if any(keyword in lowered for keyword in entry["keywords"]):
+                break
+    chain_time = time.perf_counter() - start
+
+    print(f"{len(words)} keywords, automaton built in {build_time:.2f}s")
+    print(f"aho-corasick : {messages / ac_time:9.0f} msgs/s")
+    print(f"chained 'in' : {messages / chain_time:9.0f} msgs/s")
+
+
+if __name__ == "__main__":
+    matcher = IntentMatcher()
+    for message in ["Hi, I need help in order status", "I want to get refund soon",
+                    "Can you help me with product info", "Good morning"]:
+        print(f"{message!r} -> {matcher.reply(message)!r}")
+    benchmark()
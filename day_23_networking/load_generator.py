@@ -0,0 +1,185 @@
+# Load generator for the ABC customer service server
+#
+# create_client() in d2_client.py sends one conversation with sleep(4)
+# between messages. This tool opens N connections at once (asyncio, one
+# thread), replays conversation scripts on each of them at a target total
+# message rate and prints a JSON report:
+#
+#   python load_generator.py --connections 500 --rate 5000 --duration 10
+#   python load_generator.py --script conversations.json --output report.json
+#
+# A script file is a JSON list of conversations, each a list of messages:
+#   [["Hi, I need help in order status", "I want to get refund soon"], ...]
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from d2_server import BUSY_MSG, HOST, PORT, SLOW_DOWN_MSG, raise_fd_limit
+from framing import FrameError, read_message_async, write_messages_async
+from transport import SOCKET_PATH, TRANSPORTS, open_connection
+
+DEFAULT_SCRIPTS = [
+    ["Hi, I need help in order status",
+     "I want to get refund soon",
+     "Can you help me with product info"],
+    ["Hi, I need help in order status",
+     "Where is my parcel?"],
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.sent = 0
+        self.replies = 0
+        self.busy = 0
+        self.slow_down = 0
+        self.connect_errors = 0
+        self.errors = 0
+
+    def report(self, elapsed, connections, target_rate):
+        latencies = sorted(self.latencies)
+        return {
+            "connections": connections,
+            "target_rate": target_rate,
+            "duration_s": round(elapsed, 3),
+            "sent": self.sent,
+            "replies": self.replies,
+            "throughput_msgs_per_s": round(self.replies / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p95": round(percentile(latencies, 95) * 1000, 3),
+                "p99": round(percentile(latencies, 99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            "busy_rejections": self.busy,
+            "slow_down_replies": self.slow_down,
+            "connect_errors": self.connect_errors,
+            "errors": self.errors,
+        }
+
+
+def load_scripts(path):
+    # an empty conversation would make run_connection loop without ever
+    # awaiting and stall every other connection until the deadline
+    with open(path, encoding="utf-8") as file:
+        scripts = json.load(file)
+    if not isinstance(scripts, list) or not scripts:
+        raise ValueError(f"{path}: expected a non-empty list of conversations")
+    for i, conversation in enumerate(scripts):
+        if not isinstance(conversation, list) or not conversation:
+            raise ValueError(f"{path}: conversation {i} must be a non-empty list of messages")
+        if not all(isinstance(message, str) for message in conversation):
+            raise ValueError(f"{path}: conversation {i} may only contain strings")
+    return scripts
+
+
+async def run_connection(where, scripts, interval, deadline, stats, rng):
+    try:
+        reader, writer = await open_connection(*where)
+    except OSError:
+        stats.connect_errors += 1
+        return
+    try:
+        welcome = await read_message_async(reader)
+        if welcome is None or welcome == BUSY_MSG:
+            stats.busy += 1
+            return
+        # spread the first messages so all connections do not fire together
+        next_send = time.perf_counter() + rng.random() * interval
+        while time.perf_counter() < deadline:
+            for message in rng.choice(scripts):
+                start = time.perf_counter()
+                if interval:
+                    delay = next_send - start
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    # latency counts from the planned send time: when the
+                    # server falls behind, the wait for the previous reply
+                    # is part of this message's latency (coordinated omission)
+                    start = next_send
+                    next_send += interval
+                if time.perf_counter() >= deadline:
+                    break
+                write_messages_async(writer, [message])
+                await writer.drain()
+                stats.sent += 1
+                reply = await read_message_async(reader)
+                if reply is None:
+                    stats.errors += 1
+                    return
+                stats.latencies.append(time.perf_counter() - start)
+                stats.replies += 1
+                if reply == SLOW_DOWN_MSG:
+                    stats.slow_down += 1
+        write_messages_async(writer, ["exit"])
+        await writer.drain()
+    except (OSError, asyncio.IncompleteReadError, ValueError, FrameError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def generate(host, port, connections, rate, duration, scripts, seed=None,
+                   transport="tcp", socket_path=SOCKET_PATH):
+    stats = Stats()
+    rng = random.Random(seed)
+    # per connection: one message every `interval` seconds -> total = rate
+    interval = connections / rate if rate else 0.0
+    start = time.perf_counter()
+    deadline = start + duration
+    where = (transport, host, port, socket_path)
+    results = await asyncio.gather(*[run_connection(where, scripts, interval, deadline, stats,
+                                                    random.Random(rng.random()))
+                                     for _ in range(connections)], return_exceptions=True)
+    # anything unexpected on one connection is counted, the report still comes out
+    stats.errors += sum(isinstance(result, Exception) for result in results)
+    return stats.report(time.perf_counter() - start, connections, rate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the customer service server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--transport", choices=TRANSPORTS, default="tcp")
+    parser.add_argument("--socket-path", default=SOCKET_PATH, help="socket file (unix transport)")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=1000, help="total messages/s, 0 = as fast as possible")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--script", help="JSON file with a list of conversations")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    scripts = DEFAULT_SCRIPTS
+    if args.script:
+        try:
+            scripts = load_scripts(args.script)
+        except ValueError as e:
+            parser.error(str(e))
+
+    raise_fd_limit()
+    report = asyncio.run(generate(args.host, args.port, args.connections, args.rate,
+                                  args.duration, scripts, args.seed,
+                                  args.transport, args.socket_path))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
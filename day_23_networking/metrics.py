@@ -0,0 +1,266 @@
+# In-process metrics for the customer service server
+#
+# Counter, Gauge and Histogram that handlers can update with very little
+# cost, plus a small HTTP "stats port" that serves a snapshot in the
+# Prometheus text format (curl localhost:9100/metrics).
+#
+# Counters and histograms use one shard per thread (like ShardedCounter in
+# day_21): a thread only writes its own shard, so updates need no lock, and
+# a snapshot adds the shards together. A short lived thread (one per
+# connection in thread mode) calls registry.release_thread() when it ends:
+# its shards are added to a "retired" total and dropped, so the number of
+# shards stays at the number of live threads.
+#
+# Histogram buckets are HDR style: every power of two is split into
+# SUB_BUCKETS linear steps, so any value is stored with ~6% precision while
+# covering microseconds to minutes in a few hundred buckets.
+
+import http.server
+import math
+import threading
+
+SUB_BUCKETS = 16
+SUB_BITS = 4  # 2 ** SUB_BITS == SUB_BUCKETS
+
+
+class _Sharded:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._retired = self._new_shard()  # totals of finished threads
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _merge(self, total, shard):
+        raise NotImplementedError
+
+    def _copy(self, shard):
+        raise NotImplementedError
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self):
+        with self._shards_lock:
+            return list(self._shards) + [self._copy(self._retired)]
+
+    def release(self):
+        # fold the calling thread's shard into the retired total
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            return
+        self._local.shard = None
+        with self._shards_lock:
+            self._shards.remove(shard)
+            self._merge(self._retired, shard)
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        super().__init__()
+        self.name = name
+        self.help = help
+
+    def _new_shard(self):
+        return [0]
+
+    def _merge(self, total, shard):
+        total[0] += shard[0]
+
+    def _copy(self, shard):
+        return [shard[0]]
+
+    def inc(self, amount=1):
+        self._shard()[0] += amount
+
+    def value(self):
+        return sum(shard[0] for shard in self._all_shards())
+
+    def samples(self):
+        yield self.name, "", self.value()
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help="", fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn  # optional: value is read from fn() at snapshot time
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def value(self):
+        return self.fn() if self.fn is not None else self._value
+
+    def samples(self):
+        yield self.name, "", self.value()
+
+
+def bucket_index(value, unit):
+    # value in seconds -> bucket number (HDR style log-linear)
+    n = int(value / unit)
+    if n < SUB_BUCKETS:
+        return n
+    exponent = n.bit_length() - SUB_BITS - 1
+    return (exponent + 1) * SUB_BUCKETS + ((n >> exponent) - SUB_BUCKETS)
+
+
+def bucket_upper(index, unit):
+    # upper bound (seconds) of a bucket
+    if index < SUB_BUCKETS:
+        return (index + 1) * unit
+    exponent = index // SUB_BUCKETS - 1
+    sub = index % SUB_BUCKETS
+    return ((SUB_BUCKETS + sub + 1) << exponent) * unit
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help="", unit=1e-6):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.unit = unit  # smallest step, default 1 microsecond
+
+    def _new_shard(self):
+        # [count, sum, {bucket: count}]
+        return [0, 0.0, {}]
+
+    def _merge(self, total, shard):
+        total[0] += shard[0]
+        total[1] += shard[1]
+        for index, n in shard[2].items():
+            total[2][index] = total[2].get(index, 0) + n
+
+    def _copy(self, shard):
+        return [shard[0], shard[1], dict(shard[2])]
+
+    def observe(self, value):
+        shard = self._shard()
+        shard[0] += 1
+        shard[1] += value
+        buckets = shard[2]
+        index = bucket_index(value, self.unit)
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def snapshot(self):
+        count, total, buckets = 0, 0.0, {}
+        for shard in self._all_shards():
+            count += shard[0]
+            total += shard[1]
+            for index, n in list(shard[2].items()):
+                buckets[index] = buckets.get(index, 0) + n
+        return count, total, buckets
+
+    def percentile(self, pct):
+        count, _, buckets = self.snapshot()
+        if not count:
+            return 0.0
+        target = math.ceil(count * pct / 100)
+        seen = 0
+        for index in sorted(buckets):
+            seen += buckets[index]
+            if seen >= target:
+                return bucket_upper(index, self.unit)
+        return 0.0
+
+    def samples(self):
+        count, total, buckets = self.snapshot()
+        seen = 0
+        for index in sorted(buckets):
+            seen += buckets[index]
+            yield self.name + "_bucket", f'le="{bucket_upper(index, self.unit):.6g}"', seen
+        yield self.name + "_bucket", 'le="+Inf"', count
+        yield self.name + "_sum", "", total
+        yield self.name + "_count", "", count
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, **kwargs)
+            return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help=help)
+
+    def gauge(self, name, help="", fn=None):
+        return self._get(Gauge, name, help=help, fn=fn)
+
+    def histogram(self, name, help="", unit=1e-6):
+        return self._get(Histogram, name, help=help, unit=unit)
+
+    def release_thread(self):
+        # call at the end of a short lived thread
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            if isinstance(metric, _Sharded):
+                metric.release()
+
+    def prometheus_text(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                label_text = "{" + labels + "}" if labels else ""
+                lines.append(f"{name}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def start_stats_server(port, host="localhost", metrics_registry=None):
+    # serves GET /metrics (any path works) from a daemon thread
+    source = metrics_registry or registry
+
+    class StatsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = source.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep the server console quiet
+
+    server = http.server.ThreadingHTTPServer((host, port), StatsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="stats-port").start()
+    return server
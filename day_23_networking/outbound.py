@@ -0,0 +1,107 @@
+# Per-connection outbound queue, flushed with sendmsg() scatter/gather
+#
+# A customer can send many messages in one burst. Sending every reply with
+# its own sendall() costs one syscall per reply. OutboundQueue keeps the
+# encoded replies (header and payload as separate buffers, nothing is
+# copied together) and writes all of them with one sendmsg() call. The
+# kernel may accept only part of it: fully sent buffers are dropped and the
+# rest of a half sent buffer is kept as a memoryview slice.
+#
+# The queue also has a high-water mark. The handler stops reading new
+# messages while the queue holds more than `high_water` bytes, so a client
+# that sends but never reads cannot make the server buffer without limit.
+
+import collections
+import itertools
+import socket
+import threading
+import time
+
+from framing import HEADER, FrameReader, send_message
+
+MAX_BUFFERS = 1024  # IOV_MAX on Linux: most buffers one sendmsg() accepts
+
+
+class OutboundQueue:
+    def __init__(self, sock, high_water=64 * 1024):
+        self.sock = sock
+        self.high_water = high_water
+        self.buffers = collections.deque()
+        self.size = 0          # bytes waiting to be sent
+        self.sending = False   # inside flush() (may block on a slow client)
+        self.send_calls = 0
+
+    def push(self, message):
+        payload = message.encode('utf-8')
+        self.buffers.append(HEADER.pack(len(payload)))
+        self.buffers.append(payload)
+        self.size += HEADER.size + len(payload)
+
+    def full(self):
+        return self.size >= self.high_water
+
+    def flush(self):
+        # send everything queued; blocks until the client has taken it
+        self.sending = True
+        try:
+            while self.buffers:
+                batch = list(itertools.islice(self.buffers, MAX_BUFFERS))
+                if hasattr(self.sock, "sendmsg"):
+                    sent = self.sock.sendmsg(batch)
+                else:
+                    # no sendmsg (Windows): one joined buffer
+                    sent = self.sock.send(b"".join(batch))
+                self.send_calls += 1
+                self.size -= sent
+                while sent:
+                    first = self.buffers[0]
+                    if len(first) <= sent:
+                        sent -= len(first)
+                        self.buffers.popleft()
+                    else:
+                        self.buffers[0] = memoryview(first)[sent:]
+                        sent = 0
+        finally:
+            self.sending = False
+
+
+def benchmark(messages=100000, burst=32):
+    # client sends bursts of `burst` messages, then reads the replies
+    text = "Hi, I need help in order status"
+    reply = "I will check your order. Please wait.... \n"
+
+    def client(sock):
+        reader = FrameReader(sock)
+        for _ in range(messages // burst):
+            for _ in range(burst):
+                send_message(sock, text)
+            for _ in range(burst):
+                reader.read_message()
+        sock.shutdown(socket.SHUT_WR)
+
+    for label in ("sendall per reply", "sendmsg queue"):
+        left, right = socket.socketpair()
+        thread = threading.Thread(target=client, args=(left,))
+        start = time.perf_counter()
+        thread.start()
+        reader = FrameReader(right)
+        out = OutboundQueue(right)
+        calls = 0
+        while reader.read_message() is not None:
+            if label == "sendall per reply":
+                send_message(right, reply)
+                calls += 1
+            else:
+                out.push(reply)
+                if not reader.has_frame() or out.full():
+                    out.flush()
+        thread.join()
+        elapsed = time.perf_counter() - start
+        calls = calls or out.send_calls
+        left.close()
+        right.close()
+        print(f"{label:18}: {messages / elapsed:9.0f} msgs/s, {calls} send calls")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,111 @@
+# Rate limiter for request admission (GCRA, the "token bucket" without a refill loop)
+#
+# For every key we only store one float: the theoretical arrival time (TAT)
+# of the next request. A request is allowed when it does not push the TAT
+# more than `burst` intervals into the future.
+#
+#   interval = 1 / rate
+#   tat      = max(tat, now) + interval
+#   allowed  when tat - now <= burst * interval
+#
+# Keys are spread over several small locks (stripes) so threads working on
+# different keys rarely wait for each other. Use key=None for a global limit.
+
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1, stripes=16, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.interval = 1.0 / rate
+        self.tolerance = burst * self.interval
+        self.clock = clock
+        self.stripes = [({}, threading.Lock()) for _ in range(stripes)]
+        self.calls = 0
+        self.rejected = 0
+
+    def _stripe(self, key):
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    def allow(self, key=None, cost=1):
+        # True -> admit the request, False -> shed it now (do not queue)
+        tats, lock = self._stripe(key)
+        now = self.clock()
+        with lock:
+            tat = tats.get(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + cost * self.interval
+            if new_tat - now > self.tolerance:
+                self.rejected += 1
+                return False
+            tats[key] = new_tat
+            self.calls += 1
+            if self.calls % 4096 == 0:
+                self._sweep(tats, now)
+            return True
+
+    def retryAfter(self, key=None, cost=1):
+        # seconds until a request with this cost would be allowed
+        tats, lock = self._stripe(key)
+        now = self.clock()
+        with lock:
+            tat = max(tats.get(key, now), now)
+        return max(0.0, tat + cost * self.interval - self.tolerance - now)
+
+    def forget(self, key):
+        # the key will never come back (closed connection) -> drop its TAT now
+        tats, lock = self._stripe(key)
+        with lock:
+            tats.pop(key, None)
+
+    def _sweep(self, tats, now):
+        # forget idle keys (their TAT is in the past -> same as a new key)
+        for key in [key for key, tat in tats.items() if tat < now]:
+            del tats[key]
+
+    def keys(self):
+        return sum(len(tats) for tats, _ in self.stripes)
+
+
+class Admission:
+    # global limit + per key limit together
+    def __init__(self, global_limiter=None, key_limiter=None):
+        self.global_limiter = global_limiter
+        self.key_limiter = key_limiter
+
+    def allow(self, key=None):
+        if self.key_limiter is not None and not self.key_limiter.allow(key):
+            return False
+        if self.global_limiter is not None and not self.global_limiter.allow():
+            return False
+        return True
+
+
+def benchmark(threads=8, calls_per_thread=50000, keys=1000):
+    for stripes in (1, 16):
+        limiter = RateLimiter(rate=1e9, burst=10, stripes=stripes)
+
+        def work(offset):
+            for i in range(calls_per_thread):
+                limiter.allow((offset + i) % keys)
+
+        workers = [threading.Thread(target=work, args=(i * 97,)) for i in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        print(f"stripes {stripes:2}: {threads * calls_per_thread / elapsed:10.0f} decisions/s")
+
+
+if __name__ == "__main__":
+    limiter = RateLimiter(rate=5, burst=3)
+    print([limiter.allow("192.168.1.10") for _ in range(5)])  # burst of 3, then shed
+    print(f"retry after {limiter.retryAfter('192.168.1.10'):.2f}s")
+    benchmark()
@@ -0,0 +1,191 @@
+# Concurrent DNS resolver with a TTL cache
+#
+# socket.gethostbyname() blocks until the answer comes back, so resolving
+# thousands of host names one after the other takes minutes. Resolver runs
+# the lookups on a thread pool and remembers the answers:
+#
+#   - found names are kept for `ttl` seconds
+#   - names that do not exist are kept for `negative_ttl` seconds
+#     (asking again for a broken name costs a full timeout every time)
+#   - two threads asking for the same name while it is being looked up
+#     share one lookup (one getaddrinfo call, one Future)
+#
+# getaddrinfo() does not tell us the real DNS TTL, so one fixed TTL is used.
+# The lookup function can be replaced (hosts_file_lookup, static_lookup) to
+# run everything offline.
+
+import concurrent.futures
+import socket
+import threading
+import time
+
+
+def system_lookup(host):
+    # all addresses of `host`, IPv4 first, no duplicates
+    infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+    addresses = []
+    for family, _, _, _, sockaddr in sorted(infos, key=lambda info: info[0] != socket.AF_INET):
+        if sockaddr[0] not in addresses:
+            addresses.append(sockaddr[0])
+    return addresses
+
+
+def hosts_file_lookup(path="/etc/hosts"):
+    # lookup function that only knows the names in a hosts file
+    table = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            fields = line.split("#", 1)[0].split()
+            for name in fields[1:]:
+                table.setdefault(name.lower(), []).append(fields[0])
+    return static_lookup(table)
+
+
+def static_lookup(table, delay=0.0):
+    # lookup function backed by a dict {name: [addresses]}, `delay` seconds
+    # per call to behave like a slow DNS server
+    def lookup(host):
+        if delay:
+            time.sleep(delay)
+        addresses = table.get(host.lower())
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return list(addresses)
+    return lookup
+
+
+class Resolver:
+    def __init__(self, lookup=system_lookup, workers=16, ttl=300.0, negative_ttl=30.0,
+                 max_size=100000, clock=time.monotonic):
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                          thread_name_prefix="resolver")
+        self.cache = {}      # host -> (expires_at, addresses, error)
+        self.in_flight = {}  # host -> Future
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def submit(self, host):
+        # Future with the address list (or the gaierror)
+        key = host.lower()
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.hits += 1
+                future = concurrent.futures.Future()
+                if entry[2] is not None:
+                    future.set_exception(entry[2])
+                else:
+                    future.set_result(list(entry[1]))
+                return future
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            self.misses += 1
+            future = self.pool.submit(self._lookup, key)
+            self.in_flight[key] = future
+            return future
+
+    def _lookup(self, key):
+        # any error is negative cached (UnicodeError for a too long label,
+        # whatever a custom lookup raises), so the name never stays in_flight
+        try:
+            try:
+                addresses = self.lookup(key)
+            except Exception as e:
+                self._store(key, (self.clock() + self.negative_ttl, None, e))
+                raise
+            self._store(key, (self.clock() + self.ttl, addresses, None))
+            return addresses
+        finally:
+            # after _store: a new request finds the cache entry, not a gap
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def _store(self, key, entry):
+        with self.lock:
+            if len(self.cache) >= self.max_size and key not in self.cache:
+                self._drop_expired()
+                if len(self.cache) >= self.max_size:
+                    self.cache.pop(next(iter(self.cache)))  # oldest entry
+            self.cache[key] = entry
+
+    def _drop_expired(self):
+        now = self.clock()
+        for key in [key for key, entry in self.cache.items() if entry[0] <= now]:
+            del self.cache[key]
+
+    def resolve(self, host, timeout=None):
+        # blocking: address list, raises socket.gaierror for unknown names
+        return self.submit(host).result(timeout)
+
+    def resolve_many(self, hosts, timeout=None):
+        # {host: address list or the exception}, all lookups run in parallel;
+        # one broken name does not fail the whole batch
+        futures = {host: self.submit(host) for host in hosts}
+        results = {}
+        for host, future in futures.items():
+            try:
+                results[host] = future.result(timeout)
+            except Exception as e:
+                results[host] = e
+        return results
+
+    def stats(self):
+        with self.lock:
+            return {"cached": len(self.cache), "in_flight": len(self.in_flight),
+                    "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def benchmark(names=2000, delay=0.005, workers=64):
+    # offline: a stub DNS server that needs `delay` seconds per answer
+    table = {f"host{i}.example.com": [f"10.0.{i // 256}.{i % 256}"] for i in range(names)}
+    hosts = list(table) + [f"missing{i}.example.com" for i in range(names // 10)]
+    lookup = static_lookup(table, delay)
+
+    start = time.perf_counter()
+    for host in hosts:
+        try:
+            lookup(host)
+        except OSError:
+            pass
+    sequential = time.perf_counter() - start
+
+    resolver = Resolver(lookup, workers=workers)
+    start = time.perf_counter()
+    resolver.resolve_many(hosts)
+    parallel = time.perf_counter() - start
+    start = time.perf_counter()
+    resolver.resolve_many(hosts)
+    cached = time.perf_counter() - start
+
+    # many threads asking for the same 10 names at once -> 10 lookups
+    coalescing = Resolver(lookup, workers=workers)
+    same = [f"host{i % 10}.example.com" for i in range(names)]
+    coalescing.resolve_many(same)
+    resolver.close()
+    coalescing.close()
+
+    print(f"{len(hosts)} names, {delay * 1000:.0f} ms per lookup")
+    print(f"one by one       : {sequential:7.2f}s")
+    print(f"{workers} threads       : {parallel:7.2f}s")
+    print(f"again from cache : {cached:7.2f}s")
+    print(f"{len(same)} requests for 10 names -> {coalescing.stats()['misses']} lookups")
+
+
+if __name__ == "__main__":
+    resolver = Resolver(hosts_file_lookup())
+    for host, result in resolver.resolve_many(["localhost", "no-such-host.invalid"]).items():
+        print(f"{host}: {result}")
+    resolver.close()
+    benchmark()
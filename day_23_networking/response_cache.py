@@ -0,0 +1,81 @@
+# LRU response cache for repeated customer messages
+#
+# Customers send the same few messages again and again. The cache keeps the
+# answer for the last `max_size` different messages, keyed on the
+# normalized text (lower case, extra spaces removed), for `ttl` seconds.
+# One lock protects the OrderedDict, so handlers in many threads can share
+# one cache.
+
+import collections
+import threading
+import time
+
+_MISSING = object()
+
+
+def normalize(message):
+    return " ".join(message.lower().split())
+
+
+class ResponseCache:
+    def __init__(self, max_size=10000, ttl=300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = collections.OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, message, default=None):
+        key = normalize(message)
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            if entry[0] <= now:
+                del self.entries[key]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, message, value):
+        key = normalize(message)
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, message, compute):
+        # compute(message) runs outside the lock; two threads may both
+        # compute a missing answer, the last one is kept
+        value = self.get(message, _MISSING)
+        if value is _MISSING:
+            value = compute(message)
+            self.put(message, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,95 @@
+# TCP or Unix domain socket for the customer service chat
+#
+# A client on the same machine does not need TCP: an AF_UNIX stream socket
+# skips the loopback network stack (no checksums, no TCP state machine, no
+# ports) but behaves the same for us - a byte stream, so the framing and
+# all handlers stay exactly the same. Only opening the socket differs.
+#
+#   server: python d2_server.py --transport unix --socket-path /tmp/abc.sock
+#   client: python d2_client.py --transport unix --socket-path /tmp/abc.sock
+
+import asyncio
+import os
+import socket
+import stat
+
+TRANSPORTS = ("tcp", "unix")
+SOCKET_PATH = "/tmp/abc_customer_service.sock"
+
+
+def remove_stale_socket(path):
+    # a server that crashed leaves its socket file behind -> bind() fails.
+    # Only remove it when nobody answers on it: a running server keeps it.
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)  # stale
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Another server is already listening on {path}")
+
+
+def remove_socket_file(transport, socket_path):
+    # the Unix socket file stays on disk after close() -> remove our own
+    if transport == "unix":
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def close_listener(server_socket, transport, socket_path):
+    server_socket.close()
+    remove_socket_file(transport, socket_path)
+
+
+def listen(transport, host, port, socket_path, backlog):
+    if transport == "unix":
+        remove_stale_socket(socket_path)
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(socket_path)
+    else:
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.bind((host, port))
+    # pending connections the OS keeps for us until accept()
+    server_socket.listen(backlog)
+    return server_socket
+
+
+def connect(transport, host, port, socket_path):
+    if transport == "unix":
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client_socket.connect(socket_path)
+    else:
+        client_socket = socket.create_connection((host, port))
+    return client_socket
+
+
+async def open_connection(transport, host, port, socket_path):
+    if transport == "unix":
+        return await asyncio.open_unix_connection(socket_path)
+    return await asyncio.open_connection(host, port)
+
+
+def describe(transport, host, port, socket_path):
+    return f"unix:{socket_path}" if transport == "unix" else f"{host}:{port}"
+
+
+def peer_name(address, sock):
+    # Unix socket clients have no address (accept() gives "") -> name them
+    # by the file descriptor so log lines can tell them apart
+    return address if address else f"unix:{sock.fileno()}"
+
+
+def peer_key(address):
+    # what the rate limiters count per client: the IP address for TCP,
+    # one shared key for local Unix socket clients (all on this machine)
+    return address[0] if isinstance(address, tuple) else "local"
@@ -0,0 +1,102 @@
+# Account number allocation for concurrent registration
+#
+# The design notes in project_oops.py use a global `count` for new
+# customers. That is racy with threads and needs a global lock otherwise.
+# Here every worker (thread or process) takes a block of numbers at a
+# time, and only the high-water mark of handed out blocks is saved in a
+# file. Numbers are never repeated, even after a restart: unused numbers
+# of a block are simply skipped.
+
+import fcntl
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+
+class BlockAllocator:
+    def __init__(self, path, block_size=1000, start=1):
+        self.path = path
+        self.block_size = block_size
+        self.start = start
+        self.lock = threading.Lock()  # threads of this process
+        self.local = threading.local()  # current block of each thread
+
+    def _reserveBlock(self):
+        # file lock -> safe across processes as well
+        with self.lock, open(self.path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                text = file.read().strip()
+                low = int(text) if text else self.start
+                high = low + self.block_size
+                file.seek(0)
+                file.truncate()
+                file.write(str(high))
+                file.flush()
+                os.fsync(file.fileno())
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+        return low, high
+
+    def next(self):
+        block = getattr(self.local, "block", None)
+        if block is None or block[0] >= block[1]:
+            block = list(self._reserveBlock())
+            self.local.block = block
+        number = block[0]
+        block[0] += 1
+        return number
+
+    def highWaterMark(self):
+        with open(self.path) as file:
+            return int(file.read().strip() or self.start)
+
+
+def _registerThreads(path, block_size, workers, per_worker):
+    allocator = BlockAllocator(path, block_size)
+    results = [None] * workers
+
+    def work(index):
+        results[index] = [allocator.next() for _ in range(per_worker)]
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [number for numbers in results for number in numbers]
+
+
+def _registerProcess(args):
+    path, block_size, per_worker = args
+    allocator = BlockAllocator(path, block_size)
+    return [allocator.next() for _ in range(per_worker)]
+
+
+def benchmark(total=200000, block_size=1000):
+    with tempfile.TemporaryDirectory() as folder:
+        for workers in (1, 2, 4, 8):
+            per_worker = total // workers
+
+            path = os.path.join(folder, f"threads_{workers}.hwm")
+            start = time.perf_counter()
+            numbers = _registerThreads(path, block_size, workers, per_worker)
+            elapsed = time.perf_counter() - start
+            unique = len(set(numbers)) == len(numbers)
+            print(f"threads   x{workers}: {len(numbers) / elapsed:12.0f} ids/s, unique: {unique}")
+
+            path = os.path.join(folder, f"processes_{workers}.hwm")
+            start = time.perf_counter()
+            with multiprocessing.Pool(workers) as pool:
+                chunks = pool.map(_registerProcess, [(path, block_size, per_worker)] * workers)
+            elapsed = time.perf_counter() - start
+            numbers = [number for chunk in chunks for number in chunk]
+            unique = len(set(numbers)) == len(numbers)
+            print(f"processes x{workers}: {len(numbers) / elapsed:12.0f} ids/s, unique: {unique}")
+
+
+if __name__ == "__main__":
+    benchmark()
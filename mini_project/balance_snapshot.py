@@ -0,0 +1,245 @@
+# Point-in-time balance reports without stopping debits/credits
+#
+# Versioned snapshots: every write (credit, debit, a whole transfer) gets the
+# next version number. Taking a snapshot only remembers the current version,
+# O(1) however many accounts there are. While a snapshot is open, a writer
+# saves the old balance as (version, old balance) in that account's history
+# before changing it, so a report at version s reads, per account, the old
+# value of the first change after s, or the live balance if there is none.
+# The history is one flat [version, balance, version, balance, ...] list per
+# account, made once and only changed in place: writes create no long lived
+# objects, which would otherwise trigger full garbage collections that pause
+# every thread.
+#
+# History entries no snapshot needs any more are dropped on the next write to
+# that account, so a write costs O(1) and never loops over the snapshots.
+
+import gc
+import itertools
+import threading
+import time
+
+from project_oops import Account, Bank, Customer
+
+
+class BalanceSnapshot:
+    def __init__(self, bank, version, count):
+        self.bank = bank
+        self.version = version
+        # accounts are only ever added at the end of bank.customers, so the
+        # first `count` of them are the ones that existed at snapshot time
+        self.count = count
+
+    def balance(self, username):
+        # KeyError for an account opened after the snapshot (not part of it)
+        if self.bank.position.get(username, self.count) >= self.count:
+            raise KeyError(username)
+        value = self.bank.customers[username].account.balance
+        return self._at_version(value, self.bank.history[username])
+
+    def _at_version(self, value, entries):
+        # value = live balance, read BEFORE looking at the history. Writers
+        # save (version, old balance) before changing the balance, so if
+        # `value` is already newer than the snapshot, its entry is here.
+        if not entries:
+            return value
+        entries = tuple(entries)  # writers change the list in place
+        for i in range(0, len(entries), 2):
+            if entries[i] > self.version:
+                return entries[i + 1]  # balance before the first later change
+        return value
+
+    def _accounts(self):
+        # (username, customer, history) of the accounts in the snapshot;
+        # history has the same order as customers (both filled in addCustomer)
+        bank = self.bank
+        usernames = list(itertools.islice(bank.customers, self.count))
+        return zip(usernames, list(bank.customers.values()), list(bank.history.values()))
+
+    def balances(self):
+        for username, cus, entries in self._accounts():
+            yield username, self._at_version(cus.account.balance, entries)
+
+    def total(self):
+        # balances() without the generator, reports call this a lot
+        total = 0
+        at_version = self._at_version
+        for _, cus, entries in self._accounts():
+            value = cus.account.balance
+            total += at_version(value, entries) if entries else value
+        return total
+
+    def close(self):
+        self.bank.releaseSnapshot(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotBank(Bank):
+    def __init__(self):
+        super().__init__()
+        self.write_lock = threading.Lock()
+        self.version = 0
+        self.history = {}        # username -> [version, balance before it, ...]
+        self.position = {}       # username -> index in customers
+        self.open_versions = {}  # version -> number of open snapshots
+        self.oldest_open = None  # smallest version in open_versions
+
+    def addCustomer(self, username, password):
+        # non interactive version of register() for services and benchmarks
+        with self.write_lock:
+            if username in self.customers:
+                raise ValueError("This user already has an account")
+            cus = Customer(username, password, Account())
+            self.history[username] = []
+            self.position[username] = len(self.customers)
+            self.customers[username] = cus
+            return cus
+
+    def register(self):
+        # Bank.register() would skip history / position -> go through addCustomer
+        print("\n----- Registration -----")
+        username = input("Enter your username: ")
+        password = input("Enter your password: ")
+        try:
+            self.addCustomer(username, password)
+        except ValueError as e:
+            print(e)
+
+    def _change(self, username, delta, version):
+        # caller holds write_lock
+        acc = self.customers[username].account
+        if acc.balance + delta < 0:
+            raise ValueError(f"Insufficient balance for {username}")
+        entries = self.history[username]
+        if self.oldest_open is None:
+            if entries:
+                entries.clear()
+        else:
+            if entries and entries[0] <= self.oldest_open:
+                # no open snapshot is older than these entries
+                keep = 0
+                while keep < len(entries) and entries[keep] <= self.oldest_open:
+                    keep += 2
+                del entries[:keep]
+            entries.append(version)
+            entries.append(acc.balance)
+        acc.balance += delta
+        return acc.balance
+
+    def credit(self, username, amount):
+        with self.write_lock:
+            self.version += 1
+            return self._change(username, amount, self.version)
+
+    def debit(self, username, amount):
+        with self.write_lock:
+            self.version += 1
+            return self._change(username, -amount, self.version)
+
+    def transfer(self, from_user, to_user, amount):
+        # both accounts change in the same version -> a snapshot sees both or neither
+        with self.write_lock:
+            if self.customers[from_user].account.balance < amount:
+                raise ValueError(f"Insufficient balance for {from_user}")
+            self.version += 1
+            self._change(from_user, -amount, self.version)
+            self._change(to_user, amount, self.version)
+
+    def snapshot(self):
+        with self.write_lock:
+            version = self.version
+            self.open_versions[version] = self.open_versions.get(version, 0) + 1
+            if self.oldest_open is None:
+                self.oldest_open = version
+            return BalanceSnapshot(self, version, len(self.customers))
+
+    def releaseSnapshot(self, snap):
+        with self.write_lock:
+            count = self.open_versions.get(snap.version, 0)
+            if count > 1:
+                self.open_versions[snap.version] = count - 1
+            elif count == 1:
+                del self.open_versions[snap.version]
+                self.oldest_open = min(self.open_versions) if self.open_versions else None
+
+
+def _writer(bank, usernames, stop, counts, stalls, index, slow=0.01):
+    done = 0
+    worst = 0.0
+    slow_writes = 0
+    n = len(usernames)
+    i = index
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            bank.transfer(usernames[i % n], usernames[(i * 7 + 1) % n], 1)
+        except ValueError:
+            pass
+        took = time.perf_counter() - started
+        if took > slow:
+            slow_writes += 1
+            worst = max(worst, took)
+        i += 1
+        done += 1
+    counts[index] = done
+    stalls[index] = (worst, slow_writes)
+
+
+def benchmark(customers=50000, writers=4, seconds=2.0, use_snapshot=True, report_every=0.1):
+    bank = SnapshotBank()
+    for i in range(customers):
+        bank.addCustomer(f"user{i}", "pass")
+    usernames = list(bank.customers)
+    expected_total = customers * 5000
+    gc.collect()  # do not bill the set up garbage to the first writes
+
+    stop = threading.Event()
+    counts = [0] * writers
+    stalls = [(0.0, 0)] * writers
+    threads = [threading.Thread(target=_writer, args=(bank, usernames, stop, counts, stalls, i))
+               for i in range(writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    reports = 0
+    wrong_reports = 0
+    report_time = 0.0
+    end = started + seconds
+    while time.perf_counter() < end:
+        time.sleep(report_every)  # same report rate for both ways
+        report_start = time.perf_counter()
+        if use_snapshot:
+            with bank.snapshot() as snap:
+                total = snap.total()
+        else:
+            # old way: stop every writer while the report runs
+            with bank.write_lock:
+                total = sum(cus.account.balance for cus in bank.customers.values())
+        report_time += time.perf_counter() - report_start
+        reports += 1
+        if total != expected_total:
+            wrong_reports += 1
+
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    mode = "snapshot" if use_snapshot else "global lock"
+    print(f"{mode:12}: {sum(counts) / elapsed:8.0f} transfers/s, "
+          f"writes slower than 10ms {sum(s[1] for s in stalls):4}, "
+          f"worst {max(s[0] for s in stalls) * 1000:6.1f}ms, "
+          f"{reports} reports of {report_time / reports * 1000:5.1f}ms, inconsistent {wrong_reports}")
+
+
+if __name__ == "__main__":
+    for customers in (50000, 200000):
+        print(f"{customers} accounts, 4 writers, one report every 0.1s")
+        benchmark(customers, use_snapshot=False)
+        benchmark(customers, use_snapshot=True)